@@ -1,10 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from client import Request
-from suite import ReportSuite
+from suite import AsyncReportSuite, ReportSuite
 
 
 class Account(object):
-    def __init__(self, client):
+    DEFAULT_PREFETCH_CONCURRENCY = 8
+
+    def __init__(self, client, metadata_cache=None):
+        """Creates an account.
+
+        Args:
+            metadata_cache (:obj:`metadata.MetadataCache`, optional): shared by
+                every report suite listed by the account.
+        """
         self._client = client
+        self._metadata_cache = metadata_cache
 
     def list_reports_suites(self):
         request = Request(Request.Method.GET,
@@ -13,6 +24,60 @@ class Account(object):
 
         content = response['content']
         reports_suites = [ReportSuite(
-            rs['rsid'], rs['name'], self._client) for rs in content]
+            rs['rsid'], rs['name'], self._client, self._metadata_cache) for rs in content]
 
         return reports_suites
+
+    def prefetch(self, suites, catalogs=ReportSuite.CATALOGS, max_concurrency=DEFAULT_PREFETCH_CONCURRENCY,
+                 progress=None):
+        """Populates the catalogs of many report suites through one bounded pool.
+
+        Args:
+            suites (list of :obj:`ReportSuite`)
+            catalogs (tuple): any of ``ReportSuite.CATALOGS``.
+            max_concurrency (int): catalogs loaded at once.
+            progress (callable, optional): called after every catalog with
+                the number of loaded catalogs, the total, the suite, the
+                catalog and the error or None.
+
+        Returns:
+            dict: errors by suite id, then by catalog. Empty when every
+            catalog was loaded.
+        """
+        for catalog in catalogs:
+            if catalog not in ReportSuite.CATALOGS:
+                raise ValueError('unknown catalog {}'.format(catalog))
+
+        errors = {}
+        pool = ThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            futures = dict((pool.submit(suite.load, catalog), (suite, catalog))
+                           for suite in suites for catalog in catalogs)
+
+            for done, future in enumerate(as_completed(futures), 1):
+                suite, catalog = futures[future]
+                error = future.exception()
+                if error is not None:
+                    errors.setdefault(suite.suite_id, {})[catalog] = error
+
+                if progress is not None:
+                    progress(done, len(futures), suite, catalog, error)
+        finally:
+            pool.shutdown(wait=True)
+
+        return errors
+
+
+class AsyncAccount(object):
+    """Account whose calls return futures, see :obj:`client.AsyncClient`."""
+
+    def __init__(self, async_client, metadata_cache=None):
+        self._async_client = async_client
+        self._account = Account(async_client.client, metadata_cache)
+
+    def list_reports_suites(self):
+        return self._async_client.submit(self._list_reports_suites)
+
+    def _list_reports_suites(self):
+        return [AsyncReportSuite(suite, self._async_client)
+                for suite in self._account.list_reports_suites()]
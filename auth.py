@@ -0,0 +1,354 @@
+import errno
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import jwt
+except ImportError:
+    jwt = None
+
+logger = logging.getLogger(__name__)
+
+
+class AuthError(Exception):
+    def __init__(self, status_code, error, description):
+        self.status_code = status_code
+        self.error = error
+        self.description = description
+        super(AuthError, self).__init__(description or error)
+
+
+class Token(object):
+    def __init__(self, value, expires_at):
+        self._value = value
+        self._expires_at = expires_at
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def expires_at(self):
+        """Expiry as a unix timestamp, None when the token never expires."""
+        return self._expires_at
+
+    def valid_for(self, seconds, now):
+        return self._expires_at is None or self._expires_at - seconds > now
+
+
+class TokenProvider(object):
+    """Hands out access tokens to a ``Client`` and keeps them fresh.
+
+    Tokens closer than ``refresh_margin`` seconds to their expiry are still
+    returned while a background thread fetches the next one; only expired or
+    rejected tokens make callers wait, and then a single thread fetches while
+    the others wait for its token. Subclasses implement ``_fetch``.
+
+    Args:
+        cache (:obj:`FileTokenCache`, optional): shares tokens with the other
+            processes using the same file, so that only one of them fetches.
+    """
+
+    DEFAULT_REFRESH_MARGIN = 300
+
+    def __init__(self, refresh_margin=DEFAULT_REFRESH_MARGIN, cache=None, clock=time.time):
+        self._refresh_margin = refresh_margin
+        self._cache = cache
+        self._clock = clock
+        self._token = None
+        self._fetch_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def cache_key(self):
+        """Identifies the credentials in a shared cache."""
+        raise NotImplementedError()
+
+    def token(self):
+        """Returns a valid access token."""
+        token = self._token
+        now = self._clock()
+
+        if token is None or not token.valid_for(0, now):
+            return self._refresh(token).value
+
+        if not token.valid_for(self._refresh_margin, now):
+            self._refresh_in_background(token)
+
+        return token.value
+
+    def invalidate(self, value):
+        """Drops a token the API rejected.
+
+        Returns:
+            bool: whether a request should be retried with a new token.
+        """
+        with self._lock:
+            if self._token is not None and self._token.value == value:
+                self._token = None
+
+        if self._cache is not None:
+            self._cache.discard(self.cache_key, value)
+
+        return True
+
+    def _fetch(self):
+        """Requests a new :obj:`Token`."""
+        raise NotImplementedError()
+
+    def _refresh(self, stale):
+        with self._fetch_lock:
+            current = self._token
+            # Another thread replaced the token while this one was waiting.
+            if current is not None and current is not stale and current.valid_for(self._refresh_margin, self._clock()):
+                return current
+
+            token = self._load()
+            with self._lock:
+                self._token = token
+
+            return token
+
+    def _load(self):
+        if self._cache is None:
+            return self._fetch()
+
+        return self._cache.load(self.cache_key, self._fetch,
+                                lambda token: token.valid_for(self._refresh_margin, self._clock()))
+
+    def _refresh_in_background(self, stale):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        thread = threading.Thread(target=self._refresh_quietly, args=(stale,))
+        thread.daemon = True
+        thread.start()
+
+    def _refresh_quietly(self, stale):
+        try:
+            self._refresh(stale)
+        except Exception:
+            # The current token keeps being used until it expires.
+            logger.warning('failed to refresh the access token', exc_info=True)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+class StaticTokenProvider(TokenProvider):
+    """Always returns the same token, e.g. one generated in the developer console."""
+
+    def __init__(self, token):
+        super(StaticTokenProvider, self).__init__()
+        self._token = Token(token, None)
+
+    @property
+    def cache_key(self):
+        # The token itself must not end up in cache keys.
+        return 'static/{}'.format(hashlib.sha256(self._token.value.encode('utf-8')).hexdigest())
+
+    def invalidate(self, value):
+        return False
+
+    def __str__(self):
+        return self._token.value
+
+
+class OAuthTokenProvider(TokenProvider):
+    """OAuth server-to-server credentials exchanged for tokens with the client credentials grant."""
+
+    DEFAULT_ENDPOINT = 'https://ims-na1.adobelogin.com/ims/token/v3'
+    DEFAULT_SCOPES = ('openid', 'AdobeID', 'additional_info.projectedProductContext')
+
+    def __init__(self, client_id, client_secret, scopes=DEFAULT_SCOPES, endpoint=DEFAULT_ENDPOINT, timeout=30,
+                 **kwargs):
+        super(OAuthTokenProvider, self).__init__(**kwargs)
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._scopes = tuple(scopes)
+        self._endpoint = endpoint
+        self._timeout = timeout
+
+    @property
+    def cache_key(self):
+        return 'oauth/{}/{}'.format(self._client_id, ','.join(self._scopes))
+
+    def _fetch(self):
+        requested_at = self._clock()
+        response = _post(self._endpoint, {'grant_type': 'client_credentials',
+                                          'client_id': self._client_id,
+                                          'client_secret': self._client_secret,
+                                          'scope': ','.join(self._scopes)}, self._timeout)
+
+        return Token(response['access_token'], requested_at + int(response['expires_in']))
+
+
+class JWTTokenProvider(TokenProvider):
+    """Service account (JWT) credentials exchanged for tokens. Requires the ``PyJWT`` package."""
+
+    DEFAULT_IMS_HOST = 'https://ims-na1.adobelogin.com'
+    DEFAULT_METASCOPES = ('ent_analytics_bulk_ingest_sdk',)
+    DEFAULT_JWT_LIFETIME = 24 * 3600
+
+    def __init__(self, client_id, client_secret, org_id, technical_account_id, private_key,
+                 metascopes=DEFAULT_METASCOPES, ims_host=DEFAULT_IMS_HOST, jwt_lifetime=DEFAULT_JWT_LIFETIME,
+                 timeout=30, **kwargs):
+        if jwt is None:
+            raise ImportError('PyJWT is required to sign JWT credentials')
+
+        super(JWTTokenProvider, self).__init__(**kwargs)
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._org_id = org_id
+        self._technical_account_id = technical_account_id
+        self._private_key = private_key
+        self._metascopes = tuple(metascopes)
+        self._ims_host = ims_host
+        self._jwt_lifetime = jwt_lifetime
+        self._timeout = timeout
+
+    @property
+    def cache_key(self):
+        return 'jwt/{}/{}'.format(self._client_id, self._technical_account_id)
+
+    def _fetch(self):
+        requested_at = self._clock()
+        response = _post('{}/ims/exchange/jwt'.format(self._ims_host), {'client_id': self._client_id,
+                                                                        'client_secret': self._client_secret,
+                                                                        'jwt_token': self._sign(requested_at)},
+                         self._timeout)
+
+        # The JWT exchange reports the lifetime in milliseconds.
+        return Token(response['access_token'], requested_at + int(response['expires_in']) / 1000.0)
+
+    def _sign(self, now):
+        claims = {'exp': int(now) + self._jwt_lifetime,
+                  'iss': self._org_id,
+                  'sub': self._technical_account_id,
+                  'aud': '{}/c/{}'.format(self._ims_host, self._client_id)}
+        for metascope in self._metascopes:
+            claims['{}/s/{}'.format(self._ims_host, metascope)] = True
+
+        return jwt.encode(claims, self._private_key, algorithm='RS256')
+
+
+class FileTokenCache(object):
+    """Tokens shared by the processes of a host through a JSON file.
+
+    Fetching holds an exclusive ``fcntl`` lock on ``<path>.lock``, so when many
+    workers need a new token at once one of them fetches it and the others
+    read it from the file. Without ``fcntl`` (e.g. on Windows) only threads of
+    the same process are serialized. Only the owner can read the file.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._lock_path = '{}.lock'.format(path)
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self._path
+
+    def load(self, key, fetch, fresh):
+        """Returns the cached token of ``key`` if ``fresh`` accepts it, otherwise fetches and caches one."""
+        with self._locked():
+            tokens = self._read()
+            entry = tokens.get(key)
+            if entry is not None:
+                token = Token(entry['value'], entry['expires_at'])
+                if fresh(token):
+                    return token
+
+            token = fetch()
+            tokens[key] = {'value': token.value, 'expires_at': token.expires_at}
+            self._write(tokens)
+
+            return token
+
+    def discard(self, key, value):
+        """Removes the token of ``key`` if it still is ``value``."""
+        with self._locked():
+            tokens = self._read()
+            if tokens.get(key, {}).get('value') == value:
+                del tokens[key]
+                self._write(tokens)
+
+    def _locked(self):
+        return _FileLock(self._lock_path, self._lock)
+
+    def _read(self):
+        try:
+            with open(self._path) as f:
+                return json.load(f)
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        except ValueError:
+            logger.warning('ignoring corrupted token cache %s', self._path)
+
+        return {}
+
+    def _write(self, tokens):
+        temporary_path = '{}.{}.tmp'.format(self._path, os.getpid())
+        fd = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(tokens, f)
+        # Readers never see a partially written file.
+        os.rename(temporary_path, self._path)
+
+
+class _FileLock(object):
+    def __init__(self, path, lock):
+        self._path = path
+        self._thread_lock = lock
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            if fcntl is not None:
+                self._file = os.fdopen(os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600), 'r+')
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        except Exception:
+            self._release()
+            raise
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._release()
+
+    def _release(self):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+def _post(url, data, timeout):
+    response = requests.post(url, data=data, timeout=timeout)
+    try:
+        body = response.json()
+    except ValueError:
+        body = {}
+
+    if response.status_code >= 400 or 'access_token' not in body:
+        raise AuthError(response.status_code, body.get('error'), body.get('error_description', response.text))
+
+    return body
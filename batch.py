@@ -0,0 +1,131 @@
+from collections import OrderedDict
+
+from client import BatchResult, Request
+
+
+class QueryBatch(object):
+    """Merges compatible queries into multi-metric requests.
+
+    Queries sharing everything but their metrics (report suite, dimension,
+    date range, segments, search, sort and paging) are sent as a single
+    request whose metric container holds the metrics of all of them, with
+    column ids renumbered so they can't collide. The response is then split
+    back into one response per query, carrying the query's own column ids.
+    """
+
+    # Upper bound on the metrics of a merged request.
+    DEFAULT_MAX_METRICS = 50
+
+    def __init__(self, queries, max_metrics=DEFAULT_MAX_METRICS):
+        self._queries = list(queries)
+        self._max_metrics = max_metrics
+
+    def plan(self):
+        """Returns the merged requests, each one with the indexes of its queries."""
+        groups = OrderedDict()
+        for index, query in enumerate(self._queries):
+            groups.setdefault(query.fingerprint(include_metrics=False), []).append(index)
+
+        plans = []
+        for indexes in groups.values():
+            plan = None
+            for index in indexes:
+                payload = self._queries[index].compile()
+                if plan is None or not plan.fits(payload, self._max_metrics):
+                    plan = _MergedRequest()
+                    plans.append(plan)
+                plan.add(index, payload)
+
+        return plans
+
+    def execute(self, client, max_concurrency=None):
+        """Runs the merged requests concurrently.
+
+        Returns:
+            list of :obj:`client.BatchResult`: one per query, in input order.
+            A failed merged request fails every query it contains.
+        """
+        plans = self.plan()
+        results = [None] * len(self._queries)
+
+        for result in client.execute_many([plan.request for plan in plans], max_concurrency=max_concurrency):
+            plan = plans[result.index]
+            for index, payload in plan.members:
+                request = Request(Request.Method.POST, '/reports', payload=payload)
+                if result.ok:
+                    results[index] = BatchResult(index, request, response=plan.split(index, result.response))
+                else:
+                    results[index] = BatchResult(index, request, error=result.error)
+
+        return results
+
+
+class _MergedRequest(object):
+    def __init__(self):
+        self._payload = None
+        self._members = []
+        self._metrics = []
+        self._metric_columns = {}
+        self._filters = OrderedDict()
+        # Query index -> [(original column id, merged column id)]
+        self._columns = {}
+
+    @property
+    def members(self):
+        return self._members
+
+    @property
+    def request(self):
+        payload = dict(self._payload)
+        payload['metricContainer'] = {'metrics': self._metrics}
+        payload['metricFilters'] = list(self._filters.values())
+
+        return Request(Request.Method.POST, '/reports', payload=payload)
+
+    def fits(self, payload, max_metrics):
+        added = [m for m in payload['metricContainer']['metrics'] if _metric_key(m) not in self._metric_columns]
+        return len(self._metrics) + len(added) <= max_metrics
+
+    def add(self, index, payload):
+        if self._payload is None:
+            self._payload = payload
+
+        self._members.append((index, payload))
+        for metric_filter in payload['metricFilters']:
+            self._filters.setdefault(metric_filter['id'], metric_filter)
+
+        columns = []
+        for metric in payload['metricContainer']['metrics']:
+            key = _metric_key(metric)
+            column_id = self._metric_columns.get(key)
+            if column_id is None:
+                # Identical metrics asked by several queries share a column.
+                column_id = self._metric_columns[key] = str(len(self._metrics))
+                self._metrics.append(dict(metric, columnId=column_id))
+            columns.append((metric['columnId'], column_id))
+
+        self._columns[index] = columns
+
+    def split(self, index, response):
+        """Extracts the columns of a query from the merged response."""
+        merged_ids = response.get('columns', {}).get('columnIds') or [m['columnId'] for m in self._metrics]
+        positions = [merged_ids.index(merged_id) for _, merged_id in self._columns[index]]
+
+        def pick(values):
+            return [values[position] for position in positions] if values is not None else None
+
+        split = dict(response)
+        split['rows'] = [dict(row, data=pick(row.get('data'))) for row in response.get('rows', [])]
+
+        if 'columns' in response:
+            split['columns'] = dict(response['columns'], columnIds=[column_id for column_id, _ in self._columns[index]])
+
+        if 'summaryData' in response:
+            split['summaryData'] = dict((k, pick(v) if isinstance(v, list) else v)
+                                        for k, v in response['summaryData'].items())
+
+        return split
+
+
+def _metric_key(metric):
+    return metric['id'], tuple(metric.get('filters', [])), metric.get('sort')
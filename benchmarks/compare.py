@@ -0,0 +1,45 @@
+"""Compares two result files written by ``benchmarks.run``.
+
+    python -m benchmarks.compare before.json after.json --threshold 0.1
+
+Exits with status 1 when a benchmark's median got slower by more than the
+threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(before, after):
+    """Returns ``(name, median before, median after, change)`` per shared benchmark."""
+    rows = []
+    for name in sorted(set(before['benchmarks']) & set(after['benchmarks'])):
+        old = before['benchmarks'][name]['median']
+        new = after['benchmarks'][name]['median']
+        rows.append((name, old, new, (new - old) / old if old else 0.0))
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=0.1, help='tolerated slowdown, 0.1 for 10%%')
+    config = parser.parse_args(argv)
+
+    with open(config.before) as before, open(config.after) as after:
+        rows = compare(json.load(before), json.load(after))
+
+    regressions = 0
+    print('{:<24s}{:>12s}{:>12s}{:>10s}'.format('benchmark', 'before', 'after', 'change'))
+    for name, old, new, change in rows:
+        regressed = change > config.threshold
+        regressions += regressed
+        print('{:<24s}{:>12.4f}{:>12.4f}{:>+9.1f}%{}'.format(name, old, new, change * 100, ' !' if regressed else ''))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,185 @@
+"""Runs the benchmarks and prints their results as JSON.
+
+Run from the repository root, e.g.::
+
+    python -m benchmarks.run --latency 0.02 --pages 20 --output before.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from itertools import cycle, islice
+
+from account import Account
+from client import Client, Request
+from codec import get_codec
+from dynamic_object import to_dynamic_object
+from query import DimensionFilter, FilterType, Metric, MetricFilter, Query
+from report import MultiSuiteReport, Report
+from throttle import RetryPolicy
+from transport import HTTP2Transport, InMemoryTransport, RequestsTransport
+
+from benchmarks.server import StubServer
+
+BENCHMARKS = ('query_compile', 'dynamic_object', 'single_request', 'pagination', 'pagination_fan_out',
+              'multi_suite_fan_out')
+
+
+def bench_query_compile(server, config):
+    for _ in range(config.iterations):
+        _report_query('cogntestsuite').compile()
+
+    return config.iterations
+
+
+def bench_dynamic_object(server, config):
+    for item in islice(cycle(server.fixture('dimensions')), config.iterations):
+        item = to_dynamic_object(item)
+        item.id, item.title, item.category
+
+    return config.iterations
+
+
+def bench_single_request(server, config):
+    with _client(server, config) as client:
+        for _ in range(config.requests):
+            client.execute(Request(Request.Method.GET, '/metrics?rsid=cogntestsuite'))
+
+    return config.requests
+
+
+def bench_pagination(server, config):
+    with _client(server, config) as client:
+        return sum(1 for _ in Report('cogntestsuite', _report_query('cogntestsuite'), client).rows())
+
+
+def bench_pagination_fan_out(server, config):
+    with _client(server, config) as client:
+        report = Report('cogntestsuite', _report_query('cogntestsuite'), client)
+        return sum(1 for _ in report.rows(max_concurrency=config.concurrency))
+
+
+def bench_multi_suite_fan_out(server, config):
+    with _client(server, config) as client:
+        suites = Account(client).list_reports_suites()
+        report = MultiSuiteReport(client, _report_query(suites[0].suite_id), suites,
+                                  max_concurrency=config.concurrency)
+        return len(report.union())
+
+
+def run(names, config):
+    results = {}
+    with StubServer(latency=config.latency, throttle_every=config.throttle_every, pages=config.pages,
+                    compress=config.compress) as server:
+        for name in names:
+            benchmark = globals()['bench_{}'.format(name)]
+            benchmark(server, config)  # warm up
+            server.reset()
+
+            timings = []
+            for _ in range(config.repeat):
+                started_at = time.time()
+                operations = benchmark(server, config)
+                timings.append(time.time() - started_at)
+
+            results[name] = _summarize(timings, operations, server, config.repeat)
+
+    return {'meta': _meta(), 'config': vars(config), 'benchmarks': results}
+
+
+def _summarize(timings, operations, server, repeat):
+    timings.sort()
+    median = timings[len(timings) // 2]
+    return {'operations': operations,
+            'min': timings[0],
+            'median': median,
+            'mean': sum(timings) / len(timings),
+            'max': timings[-1],
+            'ops_per_sec': operations / median if median else None,
+            'requests': server.requests // repeat,
+            'throttled': server.throttled // repeat}
+
+
+def _meta():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.STDOUT).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'commit': commit,
+            'timestamp': datetime.utcnow().isoformat()}
+
+
+def _client(server, config):
+    # Throttled requests are retried until they succeed, their cost is part
+    # of what is measured.
+    return Client('key', 'company', 'token', endpoint=server.endpoint, pool_size=config.concurrency,
+                  retry_policy=RetryPolicy(max_retries=100), transport=_transport(server, config),
+                  codec=get_codec(config.codec))
+
+
+def _transport(server, config):
+    if config.transport == 'memory':
+        return InMemoryTransport(server.respond)
+
+    if config.transport == 'http2':
+        return HTTP2Transport(config.concurrency)
+
+    return RequestsTransport(config.concurrency)
+
+
+def _report_query(suite_id):
+    metrics = [Metric('metrics/pageviews'),
+               Metric('metrics/visits', filters=[MetricFilter(FilterType.segment, 's300000000_5b0d0000')]),
+               Metric('metrics/bouncerate')]
+
+    return Query(suite_id) \
+        .select('variables/geocity', metrics) \
+        .for_range(datetime(2017, 1, 1), datetime(2017, 12, 31, 23, 59, 59, 999000)) \
+        .filter(DimensionFilter(exclude_items_ids=['0'])) \
+        .limit(50)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmarks', nargs='*', help='any of {}, all of them by default'.format(', '.join(BENCHMARKS)))
+    parser.add_argument('--repeat', type=int, default=5, help='timed rounds per benchmark')
+    parser.add_argument('--iterations', type=int, default=10000, help='iterations of CPU bound benchmarks')
+    parser.add_argument('--requests', type=int, default=50, help='requests of single_request')
+    parser.add_argument('--pages', type=int, default=20, help='pages of every report')
+    parser.add_argument('--concurrency', type=int, default=8, help='requests in flight in fan-out benchmarks')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--throttle-every', type=int, default=0, help='answer every n-th request with a 429')
+    parser.add_argument('--compress', action='store_true', help='gzip responses')
+    parser.add_argument('--codec', help='JSON codec of the client, e.g. ujson, the default one otherwise')
+    parser.add_argument('--transport', choices=('http', 'http2', 'memory'), default='http',
+                        help='memory skips the network to measure the library alone')
+    parser.add_argument('--output', help='file to write the results to instead of stdout')
+    config = parser.parse_args(argv)
+
+    unknown = set(config.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error('unknown benchmarks: {}'.format(', '.join(sorted(unknown))))
+
+    return config
+
+
+def main(argv=None):
+    config = _parse_args(argv)
+    results = run(config.benchmarks or BENCHMARKS, config)
+    output = json.dumps(results, indent=2, sort_keys=True)
+
+    if config.output:
+        with open(config.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,180 @@
+import gzip
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+from StringIO import StringIO
+from urlparse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class StubServer(object):
+    """Local stand-in for the Reporting API replaying recorded fixtures.
+
+    Serves ``/<company>/reports``, ``/metrics``, ``/dimensions``,
+    ``/segments`` and ``/collections/suites`` on ``127.0.0.1``. Reports are
+    split into ``pages`` copies of the recorded page.
+
+    Args:
+        latency (float): seconds every response is delayed by.
+        throttle_every (int): answer every n-th request with a 429, 0 never.
+        retry_after (str): ``Retry-After`` header of throttled responses.
+        pages (int): pages of every report.
+        compress (bool): gzip responses of clients accepting it.
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency=0.0, throttle_every=0, retry_after='0', pages=1,
+                 compress=False, port=0):
+        self._fixtures = dict((name, _load(fixtures_dir, name))
+                              for name in ('reports', 'metrics', 'dimensions', 'segments', 'suites'))
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.pages = pages
+        self.compress = compress
+        self._requests = 0
+        self._throttled = 0
+        self._lock = threading.Lock()
+        self._httpd = _ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        """Endpoint to create a ``client.Client`` with."""
+        return 'http://{}:{}/'.format(*self._httpd.server_address)
+
+    @property
+    def requests(self):
+        return self._requests
+
+    @property
+    def throttled(self):
+        return self._throttled
+
+    def fixture(self, name):
+        """Returns the recorded content of ``name``, e.g. ``metrics``."""
+        return self._fixtures[name]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def reset(self):
+        with self._lock:
+            self._requests = 0
+            self._throttled = 0
+
+    def respond(self, method, path, body):
+        """Returns the status code, headers and body of a response."""
+        with self._lock:
+            self._requests += 1
+            throttled = self.throttle_every and self._requests % self.throttle_every == 0
+            if throttled:
+                self._throttled += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if throttled:
+            return 429, {'Retry-After': self.retry_after}, {'error_code': '429050', 'message': 'Too many requests'}
+
+        url = urlparse(path)
+        # Paths start with the company id, e.g. /company/reports.
+        resource = '/' + url.path.lstrip('/').partition('/')[2]
+
+        if method == 'POST' and resource == '/reports':
+            return 200, {}, self._report_page(int(body.get('settings', {}).get('page', 0)))
+
+        if method == 'GET' and resource in ('/metrics', '/dimensions', '/segments'):
+            if not parse_qs(url.query).get('rsid'):
+                return 400, {}, {'errorCode': 'missing_rsid', 'errorDescription': 'rsid is required',
+                                 'errorId': 'stub'}
+            return 200, {}, self._fixtures[resource[1:]]
+
+        if method == 'GET' and resource == '/collections/suites':
+            return 200, {}, self._fixtures['suites']
+
+        return 404, {}, {'errorCode': 'not_found', 'errorDescription': resource, 'errorId': 'stub'}
+
+    def _report_page(self, page):
+        recorded = self._fixtures['reports']
+        rows = [dict(row, itemId='{}{}'.format(page, row['itemId'])) for row in recorded['rows']]
+        return dict(recorded, rows=rows, number=page, totalPages=self.pages, firstPage=page == 0,
+                    lastPage=page + 1 >= self.pages, totalElements=len(rows) * self.pages)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients close throttled responses without reading them.
+        if not isinstance(sys.exc_info()[1], socket.error):
+            HTTPServer.handle_error(self, request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Buffered and sent without delay, otherwise every response waits for
+    # the client's delayed ACK.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._reply('GET')
+
+    def do_POST(self):
+        self._reply('POST')
+
+    def _reply(self, method):
+        # The body is read whatever the method to keep the connection usable.
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or '{}')
+
+        status_code, headers, content = self.server.stub.respond(method, self.path, body)
+        content = json.dumps(content)
+
+        self.send_response(status_code)
+        if self.server.stub.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            content = _gzip(content)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _gzip(content):
+    buffer = StringIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as f:
+        f.write(content)
+
+    return buffer.getvalue()
+
+
+def _load(fixtures_dir, name):
+    with open(os.path.join(fixtures_dir, '{}.json'.format(name))) as fixture:
+        return json.load(fixture)
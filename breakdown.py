@@ -0,0 +1,201 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from client import Request
+from query import Metric, Query, QueryError
+
+
+class BreakdownNode(object):
+    """A row of a breakdown tree.
+
+    The root node holds the response of the root query. Every other node is a
+    row of its parent's response, identified by ``path``, the list of
+    (dimension id, item id) pairs leading to it. Nodes above the last level
+    also hold the response breaking them down by the next dimension.
+    """
+
+    def __init__(self, path, dimension_id, row=None, parent=None):
+        self._path = path
+        self._dimension_id = dimension_id
+        self._row = row
+        self._parent = parent
+        self._response = None
+        self._error = None
+        self._children = []
+        self._pending = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def dimension_id(self):
+        """Dimension the node is broken down by, None for leaves."""
+        return self._dimension_id
+
+    @property
+    def row(self):
+        return self._row
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @property
+    def response(self):
+        return self._response
+
+    @property
+    def error(self):
+        return self._error
+
+    @property
+    def children(self):
+        return self._children
+
+    @property
+    def is_leaf(self):
+        return self._dimension_id is None
+
+    def __iter__(self):
+        """Walks the subtree depth first."""
+        yield self
+        for child in self._children:
+            for node in child:
+                yield node
+
+
+class Breakdown(object):
+    """Breaks a query down by a list of dimensions.
+
+    Every row of the root query is broken down by the first dimension, every
+    row of those breakdowns by the second one and so on. Each breakdown is a
+    separate request built with ``Query.brakedown_filters``; requests are
+    issued concurrently as soon as their parent row is known and identical
+    requests are only sent once.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 8
+
+    def __init__(self, client, query, dimensions, max_concurrency=DEFAULT_MAX_CONCURRENCY, validator=None):
+        """Creates a breakdown.
+
+        Args:
+            validator (callable, optional): called with every request before
+                it is sent, e.g. ``ReportSuite.validate_request``. Nodes whose
+                request it rejects keep the error and aren't broken down.
+        """
+        if not isinstance(dimensions, list):
+            raise QueryError("dimensions type should be list")
+
+        if not query.dimension_id or not query.metrics:
+            raise QueryError("root query should select a dimension and metrics")
+
+        self._client = client
+        self._query = query
+        self._dimensions = dimensions
+        self._max_concurrency = max_concurrency
+        self._validator = validator
+
+    def execute(self):
+        """Runs the whole breakdown and returns the root :obj:`BreakdownNode`."""
+        root = None
+        for node in self.stream():
+            root = node
+
+        return root
+
+    def stream(self):
+        """Yields every non-leaf node once its whole subtree has completed.
+
+        Deeper subtrees come first and the root node is yielded last.
+        """
+        executor = ThreadPoolExecutor(max_workers=self._max_concurrency)
+        in_flight = {}
+        waiting = {}
+        responses = {}
+        completed = deque()
+
+        def schedule(node, query):
+            fingerprint = query.fingerprint()
+            if fingerprint in responses:
+                resolve(node, *responses[fingerprint])
+                return
+
+            if fingerprint not in waiting:
+                request = Request(Request.Method.POST, '/reports', payload=query.compile())
+                if self._validator is not None:
+                    try:
+                        self._validator(request)
+                    except Exception as e:
+                        responses[fingerprint] = (None, e)
+                        resolve(node, None, e)
+                        return
+
+                in_flight[executor.submit(self._client.execute, request)] = fingerprint
+                waiting[fingerprint] = []
+
+            waiting[fingerprint].append(node)
+
+        def resolve(node, response, error):
+            node._response = response
+            node._error = error
+            # Guards against completing the node while its children are created.
+            node._pending += 1
+
+            for row in (response or {}).get('rows', []):
+                path = node.path + ((node.dimension_id, row['itemId']),)
+                level = len(path)
+                dimension_id = self._dimensions[level - 1] if level <= len(self._dimensions) else None
+                child = BreakdownNode(path, dimension_id, row, node)
+                node._children.append(child)
+
+                if not child.is_leaf:
+                    node._pending += 1
+                    schedule(child, self._child_query(path, dimension_id))
+
+            node._pending -= 1
+            if not node._pending:
+                complete(node)
+
+        def complete(node):
+            completed.append(node)
+            parent = node.parent
+            if parent is not None:
+                parent._pending -= 1
+                if not parent._pending:
+                    complete(parent)
+
+        root = BreakdownNode((), self._query.dimension_id)
+        try:
+            schedule(root, self._query)
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    fingerprint = in_flight.pop(future)
+                    try:
+                        result = (future.result(), None)
+                    except Exception as e:
+                        result = (None, e)
+
+                    responses[fingerprint] = result
+                    for node in waiting.pop(fingerprint):
+                        resolve(node, *result)
+
+                while completed:
+                    yield completed.popleft()
+
+            while completed:
+                yield completed.popleft()
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _child_query(self, path, dimension_id):
+        filters = Query.brakedown_filters(dict((dimension, [item_id]) for dimension, item_id in path))
+        metrics = [Metric(metric.id, metric.column_id, filters=metric.filters + filters)
+                   for metric in self._query.metrics]
+
+        # The root dimension filter would be applied to the child dimension.
+        return self._query.copy().select(dimension_id, metrics).filter(None)
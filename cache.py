@@ -0,0 +1,201 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+def cache_key(request, scope=None):
+    """Canonical hash of a request's method, resource and payload.
+
+    Args:
+        scope (list, optional): whatever else the response depends on, e.g.
+            the endpoint, company and credentials of the client sending it.
+    """
+    canonical = json.dumps({'scope': scope,
+                            'method': request.method.name,
+                            'resource': request.resource,
+                            'payload': request.payload},
+                           sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache(object):
+    """Base class of the response cache backends used by ``Client``.
+
+    Subclasses implement ``get``, ``set``, ``delete`` and ``clear``; this
+    class decides for how long a response stays valid. Reports whose date
+    ranges all ended more than ``settled_after`` ago won't change anymore and
+    never expire, anything else lives for ``default_ttl`` seconds.
+    """
+
+    DEFAULT_TTL = 3600
+    DEFAULT_SETTLED_AFTER = timedelta(days=2)
+
+    _date_formats = ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d')
+
+    def __init__(self, default_ttl=DEFAULT_TTL, settled_after=DEFAULT_SETTLED_AFTER, clock=time.time):
+        self._default_ttl = default_ttl
+        self._settled_after = settled_after
+        self._clock = clock
+
+    def get(self, key):
+        """Returns the cached response or None."""
+        raise NotImplementedError()
+
+    def set(self, key, value, ttl=None):
+        """Stores a response; a ``ttl`` of None means it never expires."""
+        raise NotImplementedError()
+
+    def delete(self, key):
+        raise NotImplementedError()
+
+    def clear(self):
+        raise NotImplementedError()
+
+    def ttl_for(self, request):
+        end = self._date_range_end(request.payload)
+        if end is not None and end < datetime.fromtimestamp(self._clock()) - self._settled_after:
+            return None
+
+        return self._default_ttl
+
+    def _expires_at(self, ttl):
+        return None if ttl is None else self._clock() + ttl
+
+    def _date_range_end(self, payload):
+        date_ranges = [f.get('dateRange') for f in payload.get('globalFilters', []) + payload.get('metricFilters', [])
+                       if f.get('type') == 'dateRange']
+        if not date_ranges:
+            return None
+
+        ends = [self._parse_date(date_range.split('/')[-1]) for date_range in date_ranges]
+        if None in ends:
+            return None
+
+        return max(ends)
+
+    @classmethod
+    def _parse_date(cls, value):
+        for date_format in cls._date_formats:
+            try:
+                return datetime.strptime(value, date_format)
+            except ValueError:
+                pass
+
+        return None
+
+
+class MemoryCache(ResponseCache):
+    """Thread-safe in-process LRU cache.
+
+    Responses are stored and returned as-is, so callers should treat them as
+    read-only.
+    """
+
+    DEFAULT_MAX_ENTRIES = 1024
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, **kwargs):
+        super(MemoryCache, self).__init__(**kwargs)
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= self._clock():
+                return None
+
+            self._entries[key] = entry
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._expires_at(ttl), value)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteCache(ResponseCache):
+    """On-disk cache that can be shared by several processes.
+
+    Entries are evicted least recently used first once ``max_entries`` is
+    exceeded.
+    """
+
+    DEFAULT_MAX_ENTRIES = 100000
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, timeout=30, **kwargs):
+        super(SqliteCache, self).__init__(**kwargs)
+        self._path = path
+        self._max_entries = max_entries
+        self._timeout = timeout
+        # sqlite3 connections can't be shared between threads.
+        self._local = threading.local()
+
+        with self._connection() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS responses ('
+                               'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                               'expires_at REAL, accessed_at REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+
+    @property
+    def path(self):
+        return self._path
+
+    def get(self, key):
+        now = self._clock()
+        with self._connection() as connection:
+            row = connection.execute('SELECT value FROM responses WHERE key = ? '
+                                     'AND (expires_at IS NULL OR expires_at > ?)', (key, now)).fetchone()
+            if row is None:
+                return None
+
+            connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        now = self._clock()
+        with self._connection() as connection:
+            connection.execute('INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) '
+                               'VALUES (?, ?, ?, ?)', (key, json.dumps(value), self._expires_at(ttl), now))
+            connection.execute('DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,))
+            connection.execute('DELETE FROM responses WHERE key IN (SELECT key FROM responses '
+                               'ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)', (self._max_entries,))
+
+    def delete(self, key):
+        with self._connection() as connection:
+            connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute('DELETE FROM responses')
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=self._timeout)
+            self._local.connection = connection
+
+        return connection
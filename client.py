@@ -1,48 +1,391 @@
+import logging
 import requests
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from enum import Enum
+from contextlib import contextmanager
+from itertools import islice
+
+from auth import StaticTokenProvider, TokenProvider
+from cache import cache_key
+from codec import get_codec
+from instrument import Call, resource_path
+from stream import StreamingResponse
+from throttle import RetryPolicy
+from transport import RequestsTransport
+
+logger = logging.getLogger(__name__)
 
 
 class RequestError(Exception):
-    def __init__(self, status_code, error_code, error_message, error_id):
+    def __init__(self, status_code, error_code, error_message, error_id, retries=0):
         self.status_code = status_code
         self.error_code = error_code
         self.error_message = error_message
         self.error_id = error_id
+        # Number of times the request was sent again before giving up.
+        self.retries = retries
         super(RequestError, self).__init__(error_message)
 
 
 class Client(object):
     DEFAULT_ENDPOINT = 'https://analytics.adobe.io/api/'
+    DEFAULT_POOL_SIZE = 10
+    DEFAULT_CHUNK_SIZE = 16384
 
-    def __init__(self, api_key, company_id, token, endpoint=DEFAULT_ENDPOINT):
+    def __init__(self, api_key, company_id, token, endpoint=DEFAULT_ENDPOINT, pool_size=DEFAULT_POOL_SIZE,
+                 rate_limiter=None, retry_policy=None, cache=None, coalesce=True, instruments=None,
+                 transport=None, codec=None, compression=True):
+        """Creates a client owning a pool of keep-alive connections.
+
+        Args:
+            token (str or :obj:`auth.TokenProvider`): an access token, or a
+                provider refreshing tokens before they expire. Requests
+                rejected with a 401 are sent once more with a new token.
+            pool_size (int): maximum number of connections kept open to the
+                endpoint. Threads sharing the client wait for a free
+                connection instead of opening extra sockets.
+            transport (:obj:`transport.Transport`, optional): sends the
+                requests, e.g. an ``HTTP2Transport``. Defaults to a
+                ``RequestsTransport`` with ``pool_size`` connections.
+            codec (:obj:`codec.Codec`, optional): encodes payloads and decodes
+                responses. Defaults to the fastest exact JSON package installed.
+            compression (bool): ask for compressed responses, in every
+                encoding the transport can decompress.
+            rate_limiter (:obj:`throttle.RateLimiter`, optional): acquired
+                before every request, e.g. ``RateLimiter.for_company(company_id)``.
+            retry_policy (:obj:`throttle.RetryPolicy`, optional): handles
+                throttled and transient failures. Defaults to ``RetryPolicy()``.
+            cache (:obj:`cache.ResponseCache`, optional): serves repeated
+                requests without hitting the API.
+            coalesce (bool): concurrent calls for the same method, resource
+                and payload share a single request and receive the same
+                response object, which should be treated as read-only.
+            instruments (list of :obj:`instrument.Instrument`, optional):
+                notified before and after every request sent to the API, e.g.
+                a ``MetricsRecorder`` or a ``LogExporter``.
+        """
         self._api_key = api_key
         self._company_id = company_id
-        self._token = token
+        self._token_provider = token if isinstance(token, TokenProvider) else StaticTokenProvider(token)
         self._endpoint = '{}{}'.format(endpoint, company_id)
-        self._auth_headers = self._compose_auth_headers()
-        self._methods = {Request.Method.GET: requests.get, Request.Method.POST: requests.post}
+        # Responses depend on the company and on what the credentials may see,
+        # so clients sharing a cache only share it with identical clients.
+        self._cache_scope = [self._endpoint, company_id, api_key, self._token_provider.cache_key]
+        self._pool_size = pool_size
+        self._transport = transport if transport is not None else RequestsTransport(pool_size)
+        self._codec = codec if codec is not None else get_codec()
+        self._accept_encoding = self._transport.accept_encoding if compression else 'identity'
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self._cache = cache
+        self._coalesce = coalesce
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self._instruments = list(instruments or [])
+
+    @property
+    def company_id(self):
+        return self._company_id
+
+    @property
+    def pool_size(self):
+        return self._pool_size
+
+    @property
+    def transport(self):
+        return self._transport
+
+    @property
+    def token_provider(self):
+        return self._token_provider
+
+    @property
+    def codec(self):
+        return self._codec
+
+    @property
+    def rate_limiter(self):
+        return self._rate_limiter
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def instruments(self):
+        return self._instruments
+
+    @contextmanager
+    def timer(self, resource, phase):
+        """Reports the time spent in the block as a ``phase`` of ``resource``."""
+        started_at = time.time()
+        try:
+            yield
+        finally:
+            self.record(resource, phase, time.time() - started_at)
+
+    def record(self, resource, phase, seconds):
+        """Reports a phase timed outside of a request to the instruments."""
+        self._notify('on_phase', resource_path(resource), phase, seconds)
+
+    def _notify(self, hook, *args):
+        for instrument in self._instruments:
+            try:
+                getattr(instrument, hook)(*args)
+            except Exception:
+                logger.warning('instrument %r failed in %s', instrument, hook, exc_info=True)
+
+    def close(self):
+        """Releases the connections of the transport."""
+        self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def execute(self, request):
-        headers = request.headers.copy()
-        headers.update(self._auth_headers)
+        if not self._coalesce:
+            return self._execute_cached(request)
+
+        key = cache_key(request, self._cache_scope)
+        with self._in_flight_lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = Future()
+
+        if not leader:
+            return call.result()
+
+        try:
+            call.set_result(self._execute_cached(request, key))
+        except BaseException as e:
+            # Followers would otherwise wait forever, e.g. on KeyboardInterrupt.
+            call.set_exception(e)
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+
+        return call.result()
+
+    def _execute_cached(self, request, key=None):
+        if self._cache is None:
+            return self._execute(request)
+
+        key = key or cache_key(request, self._cache_scope)
+        response = self._cache.get(key)
+        if response is None:
+            response = self._execute(request)
+            self._cache.set(key, response, self._cache.ttl_for(request))
+
+        return response
+
+    def execute_stream(self, request, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Executes a report request without buffering its body.
+
+        Returns:
+            :obj:`stream.StreamingResponse`: yields the ``rows`` of the report
+            while they download; totals and paging metadata are available in
+            its ``metadata`` once the rows are consumed. Responses are not
+            cached.
+        """
+        call = self._start_call(request)
+        try:
+            raw_response = self._send_with_retries(request, call, stream=True)
+
+            if raw_response.status_code >= 400:
+                try:
+                    self._parse_response(raw_response, call.retries)
+                finally:
+                    raw_response.close()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._finish_call(call)
+
+        return StreamingResponse(raw_response.iter_content(chunk_size), close=raw_response.close)
+
+    def _execute(self, request):
+        call = self._start_call(request)
+        try:
+            # Streamed so that waiting for the headers and reading the body
+            # are timed separately.
+            raw_response = self._send_with_retries(request, call, stream=True)
+            with call.timer('download'):
+                call.bytes_received = len(raw_response.content)
+            call.bytes_transferred = self._transport.transferred_bytes(raw_response)
+            call.content_encoding = raw_response.headers.get('Content-Encoding')
+            with call.timer('decode'):
+                return self._parse_response(raw_response, call.retries)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._finish_call(call)
+
+    def _start_call(self, request):
+        self._notify('before_request', request)
+        return Call(request)
+
+    def _finish_call(self, call):
+        call.finish()
+        self._notify('after_request', call)
+
+    def _send_with_retries(self, request, call, stream=False):
+        with call.timer('encode'):
+            body = self._codec.encode(request.payload) if request.payload else None
+
+        reauthenticated = False
+        while True:
+            if self._rate_limiter:
+                with call.timer('throttle'):
+                    self._rate_limiter.acquire()
+
+            with call.timer('auth'):
+                token = self._token_provider.token()
+
+            try:
+                with call.timer('ttfb'):
+                    raw_response = self._send(request, body, token, stream)
+            except (requests.ConnectionError, requests.Timeout):
+                if not self._retry_policy.can_retry(call.retries):
+                    raise
+                with call.timer('backoff'):
+                    time.sleep(self._retry_policy.delay(call.retries))
+                call.retries += 1
+                continue
+
+            call.status_code = raw_response.status_code
+            call.bytes_sent += len(body or b'')
+
+            if raw_response.status_code == 401 and not reauthenticated and self._token_provider.invalidate(token):
+                # Expired or revoked token: threads rejected with it wait for a single refresh.
+                raw_response.close()
+                reauthenticated = True
+                call.retries += 1
+                continue
+
+            if self._retry_policy.should_retry(raw_response.status_code, call.retries):
+                delay = self._retry_policy.delay(call.retries, raw_response.headers.get('Retry-After'))
+                if raw_response.status_code == 429 and self._rate_limiter:
+                    self._rate_limiter.hold(delay)
+                raw_response.close()
+                with call.timer('backoff'):
+                    time.sleep(delay)
+                call.retries += 1
+                continue
+
+            return raw_response
+
+    def execute_many(self, batch, max_concurrency=None, ordered=False, validator=None):
+        """Executes many requests concurrently through the shared pool.
+
+        Args:
+            batch (iterable of :obj:`Request`): consumed lazily, so generators
+                of any size can be passed.
+            max_concurrency (int, optional): requests in flight at once.
+                Defaults to the connection pool size.
+            ordered (bool): yield results in input order instead of as soon
+                as they finish.
+            validator (callable, optional): called with each request before it
+                is sent, e.g. ``ReportSuite.validate_request``. Requests it
+                raises for are returned as errors without using any rate
+                limit budget.
+
+        Yields:
+            :obj:`BatchResult`: one per request. Failures are returned as
+            values so that one bad request doesn't abort the batch.
+        """
+        max_concurrency = max_concurrency or self._pool_size
+        pending = enumerate(batch)
+        in_flight = {}
+        finished = {}
+        next_index = 0
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+        def submit(count):
+            for index, request in islice(pending, count):
+                in_flight[executor.submit(self._execute_result, index, request, validator, time.time())] = index
+
+        try:
+            submit(max_concurrency)
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del in_flight[future]
+                    finished[future.result().index] = future.result()
+
+                submit(max_concurrency - len(in_flight))
+
+                if not ordered:
+                    for index in sorted(finished):
+                        yield finished.pop(index)
+                    continue
+
+                while next_index in finished:
+                    yield finished.pop(next_index)
+                    next_index += 1
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _execute_result(self, index, request, validator=None, submitted_at=None):
+        if submitted_at is not None:
+            self.record(request.resource, 'queue', time.time() - submitted_at)
+
+        try:
+            if validator is not None:
+                validator(request)
+            return BatchResult(index, request, response=self.execute(request))
+        except Exception as e:
+            return BatchResult(index, request, error=e)
+
+    def _send(self, request, body, token, stream=False):
+        headers = {'Accept-Encoding': self._accept_encoding}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        headers.update(request.headers)
+        headers.update(self._compose_auth_headers(token))
         url = '{}{}'.format(self._endpoint, request.resource)
 
-        raw_response = self._methods[request.method](url, headers=headers, json=request.payload)
-        response = raw_response.json()
+        return self._transport.send(request.method.name, url, headers=headers, body=body, stream=stream)
+
+    def _parse_response(self, raw_response, retries):
+        try:
+            response = self._codec.decode(raw_response.content)
+        except ValueError:
+            raise RequestError(raw_response.status_code, None, raw_response.text, None, retries)
 
-        if 'errorCode' in response:
+        if isinstance(response, dict) and 'errorCode' in response:
             raise RequestError(raw_response.status_code,
                                response['errorCode'],
                                response['errorDescription'],
-                               response['errorId'])
+                               response['errorId'],
+                               retries)
+
+        if raw_response.status_code >= 400:
+            # Gateway errors (e.g. throttling) use a different body layout.
+            error = response if isinstance(response, dict) else {}
+            raise RequestError(raw_response.status_code,
+                               error.get('error_code'),
+                               error.get('message', raw_response.text),
+                               error.get('errorId'),
+                               retries)
 
         return response
 
-    def _compose_auth_headers(self):
+    def _compose_auth_headers(self, token):
         return {
             'x-api-key': self._api_key,
             'x-proxy-global-company-id': self._company_id,
-            'Authorization': 'Bearer {}'.format(self._token)}
+            'Authorization': 'Bearer {}'.format(token)}
 
     def __str__(self):
         return """
@@ -50,10 +393,123 @@ class Client(object):
         \033[1m{:<10s}\033[0m{:>10s}
         \033[1m{:<10s}\033[0m{:>10s}
         \033[1m{:<10s}\033[0m{:>10s}
-        """.format('API Key:', self._api_key, 'Token:', self._token, 'Company Id:', self._company_id,
+        """.format('API Key:', self._api_key, 'Token:', str(self._token_provider), 'Company Id:', self._company_id,
                    'Endpoint:', self._endpoint)
 
 
+class AsyncClient(object):
+    """Non-blocking facade over a :obj:`Client`.
+
+    Requests are run by a fixed pool of ``max_concurrency`` workers sharing the
+    wrapped client's connections, and every call returns a
+    :obj:`concurrent.futures.Future` resolving to the same response (or raising
+    the same :obj:`RequestError`) as ``Client.execute``. On an asyncio loop the
+    futures can be awaited through ``asyncio.wrap_future``.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 10
+
+    def __init__(self, client, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency should be a positive number')
+
+        self._client = client
+        self._max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def client(self):
+        return self._client
+
+    @property
+    def max_concurrency(self):
+        return self._max_concurrency
+
+    def execute(self, request):
+        """Schedules a request.
+
+        Identical requests scheduled while one is pending share its future,
+        so they don't even occupy a worker.
+        """
+        key = cache_key(request)
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+
+            future = self._in_flight[key] = self.submit(self._execute, request, time.time())
+
+        # Runs right away if the request is already done, hence outside the lock.
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _execute(self, request, submitted_at):
+        self._client.record(request.resource, 'queue', time.time() - submitted_at)
+        return self._client.execute(request)
+
+    def _forget(self, key, future):
+        with self._in_flight_lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedules a blocking call that uses the wrapped client."""
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def close(self):
+        """Waits for scheduled requests and stops the workers.
+
+        The wrapped client is left open as it may be shared.
+        """
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class BatchResult(object):
+    """Outcome of a single request executed by ``Client.execute_many``."""
+
+    def __init__(self, index, request, response=None, error=None):
+        self._index = index
+        self._request = request
+        self._response = response
+        self._error = error
+
+    @property
+    def index(self):
+        """Position of the request in the submitted batch."""
+        return self._index
+
+    @property
+    def request(self):
+        return self._request
+
+    @property
+    def response(self):
+        return self._response
+
+    @property
+    def error(self):
+        return self._error
+
+    @property
+    def ok(self):
+        return self._error is None
+
+    def result(self):
+        """Returns the response or raises the error of the request."""
+        if self._error is not None:
+            raise self._error
+
+        return self._response
+
+
 class Request(object):
     Method = Enum('Method', 'GET POST')
 
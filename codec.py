@@ -0,0 +1,98 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+
+class Codec(object):
+    """Encodes request payloads and decodes response bodies."""
+
+    def __init__(self, name, encode, decode):
+        self._name = name
+        self._encode = encode
+        self._decode = decode
+
+    @property
+    def name(self):
+        return self._name
+
+    def encode(self, obj):
+        """Returns the JSON document of ``obj`` as a string of bytes."""
+        return self._encode(obj)
+
+    def decode(self, content):
+        """Parses a JSON document, raising ``ValueError`` when it is invalid."""
+        return self._decode(content)
+
+    def __repr__(self):
+        return '<Codec: {}>'.format(self._name)
+
+
+def _compact_dumps(obj):
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def _ujson_loads(content):
+    # The default parser of ujson 1.x rounds floats, e.g. metric values.
+    return ujson.loads(content, precise_float=True)
+
+
+def available_codecs():
+    """Returns the installed codecs, the default one first.
+
+    Every codec decodes floats exactly. ujson is only used when asked for by
+    name: it can't encode floats at full precision, so it only decodes and
+    payloads are encoded by the standard library.
+    """
+    codecs = []
+    if orjson is not None:
+        codecs.append(Codec('orjson', orjson.dumps, orjson.loads))
+    if simplejson is not None:
+        codecs.append(Codec('simplejson', simplejson.dumps, simplejson.loads))
+    codecs.append(Codec('json', _compact_dumps, json.loads))
+    if ujson is not None:
+        # ujson raises its own errors on invalid documents, on some versions.
+        codecs.append(Codec('ujson', _compact_dumps, _value_errors(_ujson_loads)))
+
+    return codecs
+
+
+def get_codec(name=None):
+    """Returns the codec called ``name``, or the fastest exact one installed.
+
+    Raises:
+        ValueError: the codec is unknown or its package isn't installed.
+    """
+    codecs = available_codecs()
+    if name is None:
+        return codecs[0]
+
+    for codec in codecs:
+        if codec.name == name:
+            return codec
+
+    raise ValueError("codec {} isn't available".format(name))
+
+
+def _value_errors(loads):
+    def decode(content):
+        try:
+            return loads(content)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(str(e))
+
+    return decode
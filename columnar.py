@@ -0,0 +1,171 @@
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+_NAN = float('nan')
+_ITEM_ID_BOUND = 2 ** (8 * array('l').itemsize - 1)
+
+
+class ColumnarResult(object):
+    """Array backed report rows.
+
+    Instead of one Python object per cell, metric values are stored row by row
+    in a single float64 buffer, dimension values are interned and referenced by
+    integer codes and numeric item ids are packed into an integer array. The
+    NumPy views returned by ``to_numpy`` and the metric columns of ``to_pandas``
+    share these buffers, so the result is immutable once built.
+    """
+
+    def __init__(self, metric_ids, item_ids, codes, categories, metrics):
+        self._metric_ids = list(metric_ids)
+        self._item_ids = item_ids
+        self._codes = codes
+        self._categories = categories
+        self._metrics = metrics
+
+    @classmethod
+    def from_pages(cls, metric_ids, pages):
+        """Builds a result from report responses, consuming them one at a time."""
+        width = len(metric_ids)
+        metrics = array('d')
+        codes = array('i')
+        categories = []
+        interned = {}
+        # Item ids are packed as integers until a non numeric one shows up.
+        item_ids = array('l')
+
+        for page in pages:
+            for row in page.get('rows', []):
+                item_id = row['itemId']
+                if isinstance(item_ids, array):
+                    packed = _pack_item_id(item_id)
+                    if packed is None:
+                        item_ids = [str(i) for i in item_ids]
+                        item_ids.append(item_id)
+                    else:
+                        item_ids.append(packed)
+                else:
+                    item_ids.append(item_id)
+
+                value = row.get('value')
+                code = interned.get(value)
+                if code is None:
+                    code = interned[value] = len(categories)
+                    categories.append(value)
+                codes.append(code)
+
+                data = row.get('data', [])
+                for index in range(width):
+                    cell = data[index] if index < len(data) else None
+                    metrics.append(_NAN if cell is None else cell)
+
+        return cls(metric_ids, item_ids, codes, categories, metrics)
+
+    @property
+    def metric_ids(self):
+        return self._metric_ids
+
+    @property
+    def item_ids(self):
+        if isinstance(self._item_ids, array):
+            return [str(item_id) for item_id in self._item_ids]
+
+        return self._item_ids
+
+    @property
+    def codes(self):
+        """Index of every row's dimension value in ``categories``."""
+        return self._codes
+
+    @property
+    def categories(self):
+        """Distinct dimension values, in order of appearance."""
+        return self._categories
+
+    @property
+    def values(self):
+        return [self._categories[code] for code in self._codes]
+
+    def column(self, metric_id):
+        """Returns a copy of the values of a metric."""
+        return self._metrics[self._metric_ids.index(metric_id)::len(self._metric_ids)]
+
+    def __len__(self):
+        return len(self._codes)
+
+    def to_numpy(self):
+        """Returns zero-copy float64 views of the metric columns, by metric id.
+
+        The views are strided, every metric being a column of the same buffer.
+        """
+        if numpy is None:
+            raise ImportError('numpy is required to export a ColumnarResult')
+
+        matrix = self._matrix()
+        return dict((metric_id, matrix[:, index]) for index, metric_id in enumerate(self._metric_ids))
+
+    def to_pandas(self, dimension_column='value', numeric_index=False):
+        """Returns a DataFrame indexed by item id.
+
+        The metric columns wrap the result's buffer as a single float64 block,
+        without copying it, and the dimension column is a categorical over the
+        interned values, so no per-cell Python objects are created.
+
+        Args:
+            dimension_column (str): name of the dimension value column.
+            numeric_index (bool): index by the packed integer item ids, an
+                int64 index, instead of an object index of the ``item_ids``
+                strings the rest of the library keys rows by.
+
+        Raises:
+            ValueError: ``numeric_index`` is set but some item ids aren't
+                integers.
+        """
+        if pandas is None:
+            raise ImportError('pandas is required to export a ColumnarResult')
+
+        if not numeric_index:
+            index = pandas.Index(self.item_ids, dtype=object, name='itemId')
+        elif isinstance(self._item_ids, array):
+            index = pandas.Index(_view(self._item_ids), name='itemId')
+        else:
+            raise ValueError('item ids are not all integers')
+
+        # A dict of columns would be consolidated into a new block, a 2-D
+        # array is kept as it is.
+        frame = pandas.DataFrame(self._matrix(), index=index, columns=self._metric_ids, copy=False)
+        frame.insert(0, dimension_column, pandas.Categorical.from_codes(_view(self._codes), self._categories))
+
+        return frame
+
+    def _matrix(self):
+        return _view(self._metrics).reshape(len(self), len(self._metric_ids))
+
+
+def _pack_item_id(item_id):
+    try:
+        packed = int(item_id)
+    except (TypeError, ValueError):
+        return None
+
+    # Ids like '007' or '+7' wouldn't survive the round trip.
+    if str(packed) != item_id or not -_ITEM_ID_BOUND <= packed < _ITEM_ID_BOUND:
+        return None
+
+    return packed
+
+
+def _view(buffer):
+    dtype = numpy.float64 if buffer.typecode == 'd' else numpy.dtype('i{}'.format(buffer.itemsize))
+    if not len(buffer):
+        return numpy.empty(0, dtype=dtype)
+
+    return numpy.frombuffer(buffer, dtype=dtype)
@@ -2,31 +2,132 @@ import inspect
 import inflection
 import json
 
+# Catalogs repeat the same few keys thousands of times, so translated keys
+# and whole key layouts are memoized. Both caches stop growing once full.
+_MEMO_SIZE = 4096
+_underscored = {}
+_layouts = {}
+
+
+def _underscore(key):
+    try:
+        return _underscored[key]
+    except KeyError:
+        name = inflection.underscore(key)
+        if len(_underscored) < _MEMO_SIZE:
+            _underscored[key] = name
+        return name
+
+
+def _layout(keys):
+    """Maps the attribute names of a dict with ``keys`` to its original keys."""
+    keys = tuple(keys)
+    try:
+        return _layouts[keys]
+    except KeyError:
+        layout = dict((_underscore(k), k) for k in keys)
+        if len(_layouts) < _MEMO_SIZE:
+            _layouts[keys] = layout
+        return layout
+
 
 class DynamicObject(object):
+    """Attribute access over a dictionary.
+
+    Objects created by ``to_dynamic_object`` are lazy proxies: keys are only
+    snake cased, and nested dictionaries only wrapped, when first accessed.
+    """
+
+    __slots__ = ('_raw', '_layout', '_attrs')
+
     def __init__(self, *args, **kwargs):
-        if kwargs is not None and len(kwargs) > 0:
-            for k in kwargs:
-                self.__dict__[k] = kwargs[k]
+        self._raw = {}
+        self._layout = {}
+        self._attrs = dict(kwargs) if kwargs else None
+
+    @classmethod
+    def _wrap(cls, obj):
+        instance = cls.__new__(cls)
+        instance._raw = obj
+        instance._layout = None
+        instance._attrs = None
+        return instance
+
+    def __getattr__(self, name):
+        # Only called once the slots lookup failed.
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        attrs = self._attrs
+        if attrs is not None and name in attrs:
+            return attrs[name]
+
+        if self._layout is None:
+            self._layout = _layout(self._raw)
+
+        try:
+            value = self._raw[self._layout[name]]
+        except KeyError:
+            raise AttributeError(name)
+
+        if isinstance(value, dict):
+            value = DynamicObject._wrap(value)
+            self._set(name, value)
+
+        return value
+
+    def __setattr__(self, name, value):
+        if name in DynamicObject.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            self._set(name, value)
+
+    # Slots without a __dict__ can't be pickled with the default protocol of
+    # Python 2. The layout is rebuilt on first access.
+    def __getstate__(self):
+        return {'raw': self._raw, 'attrs': self._attrs}
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '_raw', state['raw'])
+        object.__setattr__(self, '_layout', None)
+        object.__setattr__(self, '_attrs', state['attrs'])
+
+    def _set(self, name, value):
+        if self._attrs is None:
+            self._attrs = {}
+        self._attrs[name] = value
+
+    def _names(self):
+        if self._layout is None:
+            self._layout = _layout(self._raw)
+
+        names = list(self._layout)
+        if self._attrs:
+            names += [name for name in self._attrs if name not in self._layout]
+        return names
 
     def __iter__(self):
-        return self.__dict__.iteritems()
+        for name in self._names():
+            yield name, getattr(self, name)
+
+    def __dir__(self):
+        return self._names()
+
+    def _to_dict(self):
+        return dict((name, value._to_dict() if isinstance(value, DynamicObject) else value)
+                    for name, value in self)
 
     def __str__(self):
-        return json.dumps(dict(self), indent=4)
+        return json.dumps(self._to_dict(), indent=4)
 
     def __repr__(self):
-        return "<DynamicObject: %s>" % str([attr for attr in self.__dict__])
+        return "<DynamicObject: %s>" % str(self._names())
 
 
 def to_dynamic_object(obj):
     if not isinstance(obj, dict):
         raise ValueError('Function expects a dictionary!')
-    _obj = DynamicObject()
-    for k, v in obj.items():
-        _obj.__dict__[inflection.underscore(k)] = to_dynamic_object(
-            v) if isinstance(v, dict) else v
-    return _obj
+    return DynamicObject._wrap(obj)
 
 
 def create_instance(cls):
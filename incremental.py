@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from shard import Granularity, ShardedReport, ShardResult
+
+
+class IncrementalReport(ShardedReport):
+    """Sharded report whose finalized shards are kept in a persistent store.
+
+    Shards that ended more than ``open_window`` ago won't change anymore: they
+    are fetched once, saved in ``store`` under the query's date independent
+    fingerprint and served from there on later refreshes. Only the open
+    trailing shards (and any missing ones) are requested again, so the cost of
+    a refresh scales with the delta rather than with the window length.
+    """
+
+    DEFAULT_OPEN_WINDOW = timedelta(days=2)
+
+    def __init__(self, client, query, store, granularity=Granularity.day, open_window=DEFAULT_OPEN_WINDOW,
+                 clock=datetime.now, **kwargs):
+        """Creates an incremental report.
+
+        Args:
+            store (:obj:`cache.ResponseCache`): persists finalized shards and
+                the high-water mark, e.g. a ``SqliteCache`` shared by workers.
+        """
+        super(IncrementalReport, self).__init__(client, query, granularity=granularity, **kwargs)
+        self._store = store
+        self._open_window = open_window
+        self._clock = clock
+        self._key = query.fingerprint(include_dates=False)
+        self._finalized_until = None
+        self._fetched = []
+
+    @property
+    def high_water_mark(self):
+        """End of the latest finalized shard saved in the store, or None."""
+        state = self._store.get(self._key)
+        if not state:
+            return None
+
+        return datetime.strptime(state['finalized_until'], '%Y-%m-%dT%H:%M:%S')
+
+    @property
+    def fetched(self):
+        """(start_date, end_date) of the shards requested by the last refresh."""
+        return sorted(self._fetched)
+
+    def refresh(self):
+        return self.execute()
+
+    def execute(self):
+        self._finalized_until = self._clock() - self._open_window
+        self._fetched = []
+        result = super(IncrementalReport, self).execute()
+
+        finalized = [shard.end_date for shard in result.shards if shard.ok and shard.end_date <= self._finalized_until]
+        high_water_mark = self.high_water_mark
+        if finalized and (high_water_mark is None or max(finalized) > high_water_mark):
+            self._store.set(self._key, {'finalized_until': max(finalized).strftime('%Y-%m-%dT%H:%M:%S')}, ttl=None)
+
+        return result
+
+    def _fetch_shard(self, start_date, end_date, query):
+        finalized = end_date <= self._finalized_until
+        key = self._shard_key(start_date, end_date)
+
+        if finalized:
+            pages = self._store.get(key)
+            if pages is not None:
+                return ShardResult(start_date, end_date, pages=pages)
+
+        self._fetched.append((start_date, end_date))
+        result = super(IncrementalReport, self)._fetch_shard(start_date, end_date, query)
+
+        if finalized and result.ok:
+            self._store.set(key, result.pages, ttl=None)
+
+        return result
+
+    def _shard_key(self, start_date, end_date):
+        return '{}/{}/{}'.format(self._key, start_date.isoformat(), end_date.isoformat())
+
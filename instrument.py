@@ -0,0 +1,312 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def resource_path(resource):
+    """Strips the query string off a resource, e.g. ``/metrics?rsid=x``."""
+    return resource.split('?', 1)[0]
+
+
+class Call(object):
+    """Measurements of one request sent to the API by a ``Client``.
+
+    ``timings`` maps phase names to seconds:
+
+    - ``throttle``: waiting for the rate limiter.
+    - ``auth``: getting an access token, only noticeable when it is refreshed.
+    - ``backoff``: sleeping between retries.
+    - ``encode``: encoding the payload.
+    - ``ttfb``: from sending the request until its headers arrived, including
+      waiting for a pooled connection and opening it.
+    - ``download``: reading the body.
+    - ``decode``: parsing the JSON body.
+
+    ``bytes_received`` is the size of the body and ``bytes_transferred`` the
+    size it had on the wire, in its ``content_encoding``.
+
+    Phases repeated by retries are summed.
+    """
+
+    def __init__(self, request, clock=time.time):
+        self._request = request
+        self._clock = clock
+        self._started_at = clock()
+        self._duration = None
+        self.status_code = None
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.bytes_transferred = 0
+        self.content_encoding = None
+        self.error = None
+        self.timings = {}
+
+    @property
+    def request(self):
+        return self._request
+
+    @property
+    def method(self):
+        return self._request.method.name
+
+    @property
+    def resource(self):
+        """Request resource without its query string, e.g. ``/metrics``."""
+        return resource_path(self._request.resource)
+
+    @property
+    def duration(self):
+        return self._duration
+
+    @contextmanager
+    def timer(self, phase):
+        """Adds the time spent in the block to ``phase``."""
+        started_at = self._clock()
+        try:
+            yield
+        finally:
+            self.add(phase, self._clock() - started_at)
+
+    def add(self, phase, seconds):
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def finish(self):
+        self._duration = self._clock() - self._started_at
+
+    def to_dict(self):
+        return {'method': self.method,
+                'resource': self.resource,
+                'status_code': self.status_code,
+                'retries': self.retries,
+                'bytes_sent': self.bytes_sent,
+                'bytes_received': self.bytes_received,
+                'bytes_transferred': self.bytes_transferred,
+                'content_encoding': self.content_encoding,
+                'duration': self._duration,
+                'timings': dict(self.timings),
+                'error': None if self.error is None else type(self.error).__name__}
+
+
+class Instrument(object):
+    """Receives measurements from a ``Client``.
+
+    Subclasses override the hooks they need. Hooks run on the threads sending
+    the requests; exceptions they raise are logged and otherwise ignored.
+    """
+
+    def before_request(self, request):
+        """Called before a request is sent to the API (cache hits are not)."""
+
+    def after_request(self, call):
+        """Called with the :obj:`Call` of a request once it succeeded or failed."""
+
+    def on_phase(self, resource, phase, seconds):
+        """Called for phases timed outside of a request.
+
+        These are ``queue``, the time a request waited for a worker of
+        ``AsyncClient`` or ``Client.execute_many``, and ``convert``, the time
+        spent turning a response into objects.
+        """
+
+
+class Histogram(object):
+    """Cumulative histogram with fixed upper bounds."""
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self._buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    @property
+    def buckets(self):
+        return self._buckets
+
+    @property
+    def sum(self):
+        return self._sum
+
+    @property
+    def count(self):
+        return self._count
+
+    def observe(self, value):
+        self._counts[bisect_left(self._buckets, value)] += 1
+        self._sum += value
+        self._count += 1
+
+    def cumulative_counts(self):
+        """Returns ``(upper bound, count)`` pairs, ending with ``inf``."""
+        counts = []
+        total = 0
+        for bound, count in zip(self._buckets + (float('inf'),), self._counts):
+            total += count
+            counts.append((bound, total))
+
+        return counts
+
+
+class MetricsRecorder(Instrument):
+    """Thread-safe in-process counters and latency histograms.
+
+    Requests are labelled by method, resource path and status code; failures
+    that got no response have an ``error`` status.
+    """
+
+    def __init__(self, buckets=Histogram.DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._retries = defaultdict(int)
+        self._bytes_sent = defaultdict(int)
+        self._bytes_received = defaultdict(int)
+        self._bytes_transferred = defaultdict(int)
+        self._latencies = {}
+        self._phases = {}
+
+    @property
+    def requests(self):
+        """Request counts by ``(method, resource, status)``."""
+        return dict(self._requests)
+
+    @property
+    def retries(self):
+        return dict(self._retries)
+
+    @property
+    def bytes_sent(self):
+        return dict(self._bytes_sent)
+
+    @property
+    def bytes_received(self):
+        return dict(self._bytes_received)
+
+    @property
+    def bytes_transferred(self):
+        return dict(self._bytes_transferred)
+
+    @property
+    def latencies(self):
+        """Request duration histograms by ``(method, resource, status)``."""
+        return dict(self._latencies)
+
+    @property
+    def phases(self):
+        """Phase duration histograms by ``(resource, phase)``."""
+        return dict(self._phases)
+
+    def after_request(self, call):
+        key = (call.method, call.resource, MetricsRecorder._status(call))
+        with self._lock:
+            self._requests[key] += 1
+            self._retries[call.resource] += call.retries
+            self._bytes_sent[call.resource] += call.bytes_sent
+            self._bytes_received[call.resource] += call.bytes_received
+            self._bytes_transferred[call.resource] += call.bytes_transferred
+            self._histogram(self._latencies, key).observe(call.duration)
+            for phase, seconds in call.timings.items():
+                self._histogram(self._phases, (call.resource, phase)).observe(seconds)
+
+    def on_phase(self, resource, phase, seconds):
+        with self._lock:
+            self._histogram(self._phases, (resource, phase)).observe(seconds)
+
+    def _histogram(self, histograms, key):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(self._buckets)
+
+        return histogram
+
+    @staticmethod
+    def _status(call):
+        return str(call.status_code) if call.status_code is not None else 'error'
+
+
+class PrometheusExporter(object):
+    """Renders a :obj:`MetricsRecorder` in the Prometheus text format."""
+
+    DEFAULT_NAMESPACE = 'adobe_analytics'
+
+    def __init__(self, recorder, namespace=DEFAULT_NAMESPACE):
+        self._recorder = recorder
+        self._namespace = namespace
+
+    def render(self):
+        recorder = self._recorder
+        lines = []
+        self._counter(lines, 'requests_total', 'Requests sent to the API.',
+                      ('method', 'resource', 'status'), recorder.requests)
+        self._counter(lines, 'retries_total', 'Requests sent again after a failure.',
+                      ('resource',), self._keyed(recorder.retries))
+        self._counter(lines, 'request_bytes_total', 'Request body bytes sent.',
+                      ('resource',), self._keyed(recorder.bytes_sent))
+        self._counter(lines, 'response_bytes_total', 'Response body bytes received, decompressed.',
+                      ('resource',), self._keyed(recorder.bytes_received))
+        self._counter(lines, 'response_transferred_bytes_total', 'Response body bytes received on the wire.',
+                      ('resource',), self._keyed(recorder.bytes_transferred))
+        self._histograms(lines, 'request_duration_seconds', 'Duration of requests.',
+                         ('method', 'resource', 'status'), recorder.latencies)
+        self._histograms(lines, 'phase_duration_seconds', 'Duration of request phases.',
+                         ('resource', 'phase'), recorder.phases)
+
+        return '\n'.join(lines) + '\n'
+
+    def _counter(self, lines, name, help, label_names, values):
+        name = self._name(name)
+        lines.append('# HELP {} {}'.format(name, help))
+        lines.append('# TYPE {} counter'.format(name))
+        for labels, value in sorted(values.items()):
+            lines.append('{}{{{}}} {}'.format(name, self._labels(label_names, labels), value))
+
+    def _histograms(self, lines, name, help, label_names, histograms):
+        name = self._name(name)
+        lines.append('# HELP {} {}'.format(name, help))
+        lines.append('# TYPE {} histogram'.format(name))
+        for labels, histogram in sorted(histograms.items()):
+            labels = self._labels(label_names, labels)
+            for bound, count in histogram.cumulative_counts():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(name, labels, le, count))
+            lines.append('{}_sum{{{}}} {}'.format(name, labels, repr(histogram.sum)))
+            lines.append('{}_count{{{}}} {}'.format(name, labels, histogram.count))
+
+    def _name(self, name):
+        return '{}_{}'.format(self._namespace, name) if self._namespace else name
+
+    @staticmethod
+    def _keyed(values):
+        return dict(((key,), value) for key, value in values.items())
+
+    @staticmethod
+    def _labels(names, values):
+        return ','.join('{}="{}"'.format(name, PrometheusExporter._escape(value)) for name, value in zip(names, values))
+
+    @staticmethod
+    def _escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class LogExporter(Instrument):
+    """Logs every request as a single JSON line.
+
+    The measurements are also attached to the log record as its ``call``
+    attribute for handlers that format records themselves.
+    """
+
+    def __init__(self, log=logger, level=logging.INFO):
+        self._log = log
+        self._level = level
+
+    def after_request(self, call):
+        fields = call.to_dict()
+        self._log.log(self._level, json.dumps(fields, sort_keys=True), extra={'call': fields})
@@ -0,0 +1,79 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataCache(object):
+    """Report suite catalogs shared between clients and processes.
+
+    Catalogs are stored in a :obj:`cache.ResponseCache` backend (a
+    ``SqliteCache`` to share them between worker processes) under their
+    company id, report suite id and catalog type. Catalogs older than ``ttl``
+    are still served while a background thread fetches a fresh copy; only
+    catalogs older than ``max_stale`` are reloaded before returning.
+    """
+
+    DEFAULT_TTL = 3600
+    DEFAULT_MAX_STALE = 7 * 24 * 3600
+
+    def __init__(self, store, ttl=DEFAULT_TTL, max_stale=DEFAULT_MAX_STALE, clock=time.time):
+        self._store = store
+        self._ttl = ttl
+        self._max_stale = max_stale
+        self._clock = clock
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(company_id, suite_id, catalog):
+        return 'metadata/{}/{}/{}'.format(company_id, suite_id, catalog)
+
+    def get(self, company_id, suite_id, catalog, loader):
+        """Returns a catalog, calling ``loader`` to fetch it when needed.
+
+        The loader should return JSON serializable content. An empty catalog
+        is cached like any other one.
+        """
+        key = MetadataCache.key(company_id, suite_id, catalog)
+        entry = self._store.get(key)
+
+        if entry is not None:
+            age = self._clock() - entry['fetched_at']
+            if age <= self._ttl:
+                return entry['value']
+
+            if self._max_stale is None or age <= self._max_stale:
+                self._revalidate(key, loader)
+                return entry['value']
+
+        return self._load(key, loader)
+
+    def invalidate(self, company_id, suite_id, catalog):
+        self._store.delete(MetadataCache.key(company_id, suite_id, catalog))
+
+    def _load(self, key, loader):
+        value = loader()
+        self._store.set(key, {'fetched_at': self._clock(), 'value': value}, ttl=None)
+        return value
+
+    def _revalidate(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        thread = threading.Thread(target=self._refresh, args=(key, loader))
+        thread.daemon = True
+        thread.start()
+
+    def _refresh(self, key, loader):
+        try:
+            self._load(key, loader)
+        except Exception:
+            # The stale copy keeps being served until a refresh succeeds.
+            logger.warning('failed to refresh %s', key, exc_info=True)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
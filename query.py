@@ -1,7 +1,9 @@
 
+import copy
+import hashlib
+import json
 from datetime import datetime
 from enum import Enum
-from os import urandom
 
 
 class QueryError(Exception):
@@ -31,6 +33,40 @@ class Query(object):
         self._page = 0
         self._translation = None
 
+    @property
+    def suite_id(self):
+        return self._suite_id
+
+    @property
+    def dimension_id(self):
+        return self._dimension_id
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    @property
+    def start_date(self):
+        return self._start_date
+
+    @property
+    def end_date(self):
+        return self._end_date
+
+    def copy(self):
+        """Returns a copy that can be refined without altering this query."""
+        query = copy.copy(self)
+        query._translation = None
+        query._metrics_filter = None
+
+        if self._metrics is not None:
+            query._metrics = list(self._metrics)
+
+        if self._segments is not None:
+            query._segments = list(self._segments)
+
+        return query
+
     def select(self, dimension_id, metrics):
         if not isinstance(dimension_id, basestring):
             raise QueryError("dimension_id type should be string")
@@ -113,7 +149,10 @@ class Query(object):
     def next(self):
         """Handles report pagination"""
         self._page += 1
-        self._translation['settings'].update({'page': str(self._page)})
+        if self._translation:
+            self._translation['settings'].update({'page': str(self._page)})
+
+        return self
 
     def compile(self):
         if not self._dimension_id:
@@ -144,6 +183,27 @@ class Query(object):
 
         return self._translation
 
+    def fingerprint(self, include_dates=True, include_metrics=True):
+        """Returns a hash that is identical for queries compiling to the same payload.
+
+        Args:
+            include_dates (bool): when False the date range and page are left
+                out, identifying the report whatever window it covers.
+            include_metrics (bool): when False the metrics and their filters
+                are left out, identifying queries that can share a request.
+        """
+        translation = dict(self.compile())
+
+        if not include_metrics:
+            del translation['metricContainer']
+            del translation['metricFilters']
+
+        if not include_dates:
+            translation['globalFilters'] = [f for f in translation['globalFilters'] if f['type'] != 'dateRange']
+            translation['settings'] = dict((k, v) for k, v in translation['settings'].items() if k != 'page')
+
+        return _hash(translation)
+
     @staticmethod
     def brakedown_filters(dimensions):
         """Breaks down the report based on the specified dimensions"""
@@ -249,7 +309,6 @@ class MetricFilter(object):
                  FilterType.breakdown: 'breakdown'}
 
     def __init__(self, filter_type, value, id=None):
-        self._id = urandom(8).encode('hex') if not id else id
         self._filter_type = filter_type
         # Attr value data structure depends on filter type (e.g.: dimension, granularity, etc)
 
@@ -258,6 +317,8 @@ class MetricFilter(object):
                 "for breakdown filter `value` arg should be a tuple with dimension id and rows ids")
 
         self._value = value
+        # Derived from the content so that equal filters share ids across queries.
+        self._id = self._compose_id() if not id else id
 
     @property
     def id(self):
@@ -271,6 +332,9 @@ class MetricFilter(object):
     def value(self):
         return self._value
 
+    def _compose_id(self):
+        return _hash([self._compose_type(), self._value])[:16]
+
     def _compose_type(self):
         return MetricFilter._type_map[self._filter_type]
 
@@ -294,6 +358,11 @@ class MetricFilter(object):
         return metric_filter_map
 
 
+def _hash(obj):
+    canonical = json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
 class DimensionFilter(object):
     def __init__(self, *args, **kwargs):
         self._include_search_total = True
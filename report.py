@@ -1,4 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from client import Request
+from columnar import ColumnarResult
+
+
 class Report(object):
+    """Lazily executed report.
+
+    Iterating a report yields its rows page by page. While the caller consumes
+    a page the next one is already being fetched, so at most two pages are held
+    in memory whatever the size of the report.
+    """
+
     def __init__(self, suite_id, query, client):
         self._suite_id = suite_id
         self._query = query
@@ -20,6 +33,175 @@ class Report(object):
     def metrics(self):
         return []
 
+    def __iter__(self):
+        return self.rows()
+
+    def rows(self, max_concurrency=None):
+        for response in self.pages(max_concurrency):
+            for row in response.get('rows', []):
+                yield row
+
+    def to_columns(self, max_concurrency=None):
+        """Fetches every page into a :obj:`columnar.ColumnarResult`."""
+        metric_ids = [metric.id for metric in self._query.metrics]
+
+        return ColumnarResult.from_pages(metric_ids, self.pages(max_concurrency))
+
+    def pages(self, max_concurrency=None):
+        """Yields the response of every page, starting at the query's page.
+
+        Args:
+            max_concurrency (int, optional): when given, the pages following
+                the first one are requested concurrently as soon as its
+                ``totalPages`` is known, instead of one after the other. They
+                are still yielded in order.
+        """
+        return self._pages(self._query.compile(), max_concurrency)
+
+    def _pages(self, payload, max_concurrency=None):
+        page = int(payload['settings']['page'])
+
+        if not max_concurrency:
+            return self._prefetch_pages(payload, page)
+
+        return self._fan_out_pages(payload, page, max_concurrency)
+
+    def _prefetch_pages(self, payload, page):
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(self._client.execute, self._page_request(payload, page))
+
+        try:
+            while future is not None:
+                response = future.result()
+                future = None
+                if not self._is_last_page(response, page):
+                    future = executor.submit(self._client.execute, self._page_request(payload, page + 1))
+
+                yield response
+                page += 1
+        finally:
+            if future is not None:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _fan_out_pages(self, payload, page, max_concurrency):
+        response = self._client.execute(self._page_request(payload, page))
+        yield response
+
+        if self._is_last_page(response, page):
+            return
+
+        if 'totalPages' not in response:
+            for response in self._prefetch_pages(payload, page + 1):
+                yield response
+            return
+
+        batch = (self._page_request(payload, number)
+                 for number in range(page + 1, response['totalPages']))
+        for result in self._client.execute_many(batch, max_concurrency=max_concurrency, ordered=True):
+            yield result.result()
+
+    def _page_request(self, payload, page):
+        page_payload = dict(payload, rsid=self._suite_id)
+        page_payload['settings'] = dict(payload['settings'], page=str(page))
+
+        return Request(Request.Method.POST, '/reports', payload=page_payload)
+
+    @staticmethod
+    def _is_last_page(response, page):
+        if 'lastPage' in response:
+            return response['lastPage']
+
+        if 'totalPages' in response:
+            return page + 1 >= response['totalPages']
+
+        return not response.get('rows')
+
+
+class SuiteResult(object):
+    """Pages of one report suite, or the error that prevented fetching them."""
+
+    def __init__(self, suite_id, pages=None, error=None):
+        self._suite_id = suite_id
+        self._pages = pages or []
+        self._error = error
+
+    @property
+    def suite_id(self):
+        return self._suite_id
+
+    @property
+    def pages(self):
+        return self._pages
+
+    @property
+    def error(self):
+        return self._error
+
+    @property
+    def ok(self):
+        return self._error is None
+
+    def rows(self):
+        for page in self._pages:
+            for row in page.get('rows', []):
+                yield row
+
+
+class MultiSuiteReport(object):
+    """Runs one query against many report suites concurrently.
+
+    The query is compiled once; each suite only gets a copy of the compiled
+    payload with its own ``rsid``.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 8
+
+    def __init__(self, client, query, suites, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        """Creates a report.
+
+        Args:
+            suites (list): :obj:`suite.ReportSuite` objects, e.g. from
+                ``Account.list_reports_suites``, or report suite ids.
+        """
+        self._client = client
+        self._query = query
+        self._suite_ids = [getattr(suite, 'suite_id', suite) for suite in suites]
+        self._max_concurrency = max_concurrency
+
+    def execute(self):
+        """Returns a :obj:`SuiteResult` per suite, in the order of ``suites``."""
+        payload = self._query.compile()
+        executor = ThreadPoolExecutor(max_workers=self._max_concurrency)
+        try:
+            futures = [executor.submit(self._fetch_suite, suite_id, payload) for suite_id in self._suite_ids]
+            return [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=True)
+
+    def union(self):
+        """Returns the rows of every suite, each one tagged with its ``rsid``.
+
+        Raises:
+            Exception: the error of the first suite that failed.
+        """
+        rows = []
+        for result in self.execute():
+            if not result.ok:
+                raise result.error
+
+            rows.extend(dict(row, rsid=result.suite_id) for row in result.rows())
+
+        return rows
+
+    def _fetch_suite(self, suite_id, payload):
+        try:
+            pages = list(Report(suite_id, self._query, self._client)._pages(payload))
+        except Exception as e:
+            return SuiteResult(suite_id, error=e)
+
+        return SuiteResult(suite_id, pages=pages)
+
 
 class Value(object):
     def __init__(self, value_id, value, raw_value):
@@ -0,0 +1,236 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from enum import Enum
+
+from client import Request
+from query import QueryError
+from report import Report
+
+Granularity = Enum('Granularity', 'day week month')
+
+# Metrics counting distinct entities or derived from other metrics can't be
+# summed across shards.
+_NON_ADDITIVE_MARKERS = ('visitor', 'average', 'rate', 'percent', 'ratio', 'per')
+
+
+def is_additive(metric_id):
+    """Guesses whether a metric's values can be summed across date ranges.
+
+    Calculated metrics are opaque and treated as non additive.
+    """
+    if not metric_id.startswith('metrics/'):
+        return False
+
+    name = metric_id[len('metrics/'):].lower()
+    return not any(marker in name for marker in _NON_ADDITIVE_MARKERS)
+
+
+def split_range(start_date, end_date, granularity):
+    """Splits a date range on day, week (monday) or month boundaries.
+
+    Shards are contiguous, each one ending where the next starts; the first
+    and last shards are clipped to the given range.
+    """
+    if not isinstance(granularity, Granularity):
+        raise QueryError("granularity type should be Granularity")
+
+    if start_date > end_date:
+        raise QueryError("start_date can't be greater than end_date")
+
+    shards = []
+    shard_start = start_date
+    while shard_start < end_date:
+        shard_end = min(_next_boundary(shard_start, granularity), end_date)
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end
+
+    return shards or [(start_date, end_date)]
+
+
+def _next_boundary(date, granularity):
+    day = datetime(date.year, date.month, date.day)
+
+    if granularity == Granularity.day:
+        return day + timedelta(days=1)
+
+    if granularity == Granularity.week:
+        return day + timedelta(days=7 - day.weekday())
+
+    if date.month == 12:
+        return datetime(date.year + 1, 1, 1)
+
+    return datetime(date.year, date.month + 1, 1)
+
+
+class ShardResult(object):
+    """Rows of a single shard, or the error that prevented fetching them."""
+
+    def __init__(self, start_date, end_date, pages=None, error=None):
+        self._start_date = start_date
+        self._end_date = end_date
+        self._pages = pages or []
+        self._error = error
+
+    @property
+    def start_date(self):
+        return self._start_date
+
+    @property
+    def end_date(self):
+        return self._end_date
+
+    @property
+    def pages(self):
+        return self._pages
+
+    @property
+    def error(self):
+        return self._error
+
+    @property
+    def ok(self):
+        return self._error is None
+
+
+class ShardedResult(object):
+    """Shard results merged back into a single report.
+
+    Rows of different shards sharing an ``itemId`` are merged by summing their
+    additive columns. Columns of non additive metrics are listed in
+    ``non_additive`` and set to None wherever values of several shards meet;
+    their per-shard values remain available through ``shards``.
+    """
+
+    def __init__(self, metric_ids, shards, additive):
+        self._shards = shards
+        self._non_additive = [metric_id for metric_id, flag in zip(metric_ids, additive) if not flag]
+        self._rows, self._totals = self._merge(shards, additive)
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @property
+    def totals(self):
+        return self._totals
+
+    @property
+    def non_additive(self):
+        return self._non_additive
+
+    @property
+    def shards(self):
+        return self._shards
+
+    @property
+    def errors(self):
+        return [shard for shard in self._shards if not shard.ok]
+
+    @property
+    def complete(self):
+        return not self.errors
+
+    @staticmethod
+    def _merge(shards, additive):
+        rows = OrderedDict()
+        totals = None
+
+        for shard in shards:
+            for page in shard.pages:
+                for row in page.get('rows', []):
+                    merged = rows.get(row['itemId'])
+                    if merged is None:
+                        rows[row['itemId']] = {'itemId': row['itemId'],
+                                               'value': row.get('value'),
+                                               'data': list(row.get('data', []))}
+                    else:
+                        _merge_values(merged['data'], row.get('data', []), additive)
+
+            if shard.pages:
+                shard_totals = shard.pages[0].get('summaryData', {}).get('totals', [])
+                if totals is None:
+                    totals = list(shard_totals)
+                else:
+                    _merge_values(totals, shard_totals, additive)
+
+        return list(rows.values()), totals or []
+
+
+def _merge_values(target, values, additive):
+    for index, value in enumerate(values[:len(target)]):
+        if additive[index] and target[index] is not None:
+            target[index] += value
+        else:
+            target[index] = None
+
+
+class ShardedReport(object):
+    """Runs a query as many smaller date range shards executed concurrently.
+
+    The range set with ``Query.for_range`` is split by ``granularity``. Each
+    shard is an independent request, so with a client cache only failed or
+    recent shards are fetched again when the report is re-run: shards that
+    closed in the past are cached without expiry.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 8
+
+    def __init__(self, client, query, granularity=Granularity.day, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 additive_metrics=None, validator=None):
+        """Creates a sharded report.
+
+        Args:
+            additive_metrics (list, optional): ids of the metrics that can be
+                summed across shards. Guessed by :func:`is_additive` otherwise.
+            validator (callable, optional): called with the request of the
+                first shard before anything is sent, e.g.
+                ``ReportSuite.validate_request``. Shards only differ by date
+                range, so one check covers all of them.
+        """
+        if not query.metrics:
+            raise QueryError("metrics must be specified")
+
+        if not query.start_date or not query.end_date:
+            raise QueryError("start_date and end_date are required to shard a query")
+
+        self._client = client
+        self._query = query
+        self._granularity = granularity
+        self._max_concurrency = max_concurrency
+        self._additive_metrics = additive_metrics
+        self._validator = validator
+
+    def shards(self):
+        """Returns a (start_date, end_date, query) tuple per shard."""
+        return [(start_date, end_date, self._query.copy().for_range(start_date, end_date))
+                for start_date, end_date in split_range(self._query.start_date, self._query.end_date,
+                                                        self._granularity)]
+
+    def execute(self):
+        metric_ids = [metric.id for metric in self._query.metrics]
+        if self._additive_metrics is None:
+            additive = [is_additive(metric_id) for metric_id in metric_ids]
+        else:
+            additive = [metric_id in self._additive_metrics for metric_id in metric_ids]
+
+        shards = self.shards()
+        if self._validator is not None:
+            self._validator(Request(Request.Method.POST, '/reports', payload=shards[0][2].compile()))
+
+        executor = ThreadPoolExecutor(max_workers=self._max_concurrency)
+        try:
+            futures = [executor.submit(self._fetch_shard, *shard) for shard in shards]
+            shards = [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=True)
+
+        return ShardedResult(metric_ids, shards, additive)
+
+    def _fetch_shard(self, start_date, end_date, query):
+        try:
+            pages = list(Report(query.suite_id, query, self._client).pages())
+        except Exception as e:
+            return ShardResult(start_date, end_date, error=e)
+
+        return ShardResult(start_date, end_date, pages=pages)
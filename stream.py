@@ -0,0 +1,152 @@
+import codecs
+import json
+import re
+from numbers import Number
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+_decoder = json.JSONDecoder()
+
+
+class StreamingResponse(object):
+    """Report response whose rows are parsed while the body downloads.
+
+    Iterating yields the elements of the top level ``rows`` array one at a
+    time; every other top level key (totals, paging, columns) is collected in
+    ``metadata``, which is complete once iteration has finished.
+    """
+
+    def __init__(self, chunks, close=None):
+        """Creates a response.
+
+        Args:
+            chunks (iterable): raw UTF-8 encoded pieces of the body.
+            close (callable, optional): called once the body is consumed.
+        """
+        self._chunks = chunks
+        self._close = close
+        self._metadata = {}
+        self._consumed = False
+
+    @property
+    def metadata(self):
+        return self._metadata
+
+    @property
+    def consumed(self):
+        return self._consumed
+
+    def __iter__(self):
+        return self.rows()
+
+    def rows(self):
+        if self._consumed:
+            raise ValueError('response body was already consumed')
+
+        try:
+            for row in _RowParser(self._chunks, self._metadata).parse():
+                yield row
+            self._consumed = True
+        finally:
+            self.close()
+
+    def close(self):
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+
+class _RowParser(object):
+    # Buffered text already parsed is dropped once it grows past this size.
+    _COMPACT_SIZE = 65536
+
+    def __init__(self, chunks, metadata):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._metadata = metadata
+        self._buffer = u''
+        self._pos = 0
+        self._eof = False
+
+    def parse(self):
+        self._expect(u'{')
+        while True:
+            token = self._peek()
+            if token == u'}':
+                return
+
+            if token == u',':
+                self._pos += 1
+                continue
+
+            key = self._value()
+            self._expect(u':')
+
+            if key == u'rows':
+                for row in self._array():
+                    yield row
+            else:
+                self._metadata[key] = self._value()
+
+    def _array(self):
+        self._expect(u'[')
+        while True:
+            token = self._peek()
+            if token == u']':
+                self._pos += 1
+                return
+
+            if token == u',':
+                self._pos += 1
+                continue
+
+            yield self._value()
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                self._read()
+                continue
+
+            # Numbers aren't delimited: "12" may be the start of "123", and
+            # "1." the start of "1.5", parsed as 1.
+            if isinstance(value, Number) and not isinstance(value, bool) \
+                    and not self._eof and _NUMBER_TAIL.match(self._buffer, end):
+                self._read()
+                continue
+
+            self._pos = end
+            return value
+
+    def _expect(self, token):
+        if self._peek() != token:
+            raise ValueError('expected {!r} at position {}'.format(token, self._pos))
+
+        self._pos += 1
+
+    def _peek(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+
+            self._read()
+
+    def _read(self):
+        if self._eof:
+            raise ValueError('response body is truncated')
+
+        if self._pos > self._COMPACT_SIZE:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            self._buffer += self._decoder.decode(b'', final=True)
+            return
+
+        self._buffer += self._decoder.decode(chunk)
@@ -1,7 +1,17 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 from client import Request
-from dynamic_object import DynamicObject, to_dynamic_object
+from dynamic_object import to_dynamic_object
+from query import QueryError
+
+
+class ValidationError(QueryError):
+    """Raised when a query references ids missing from the suite catalogs."""
+
+    def __init__(self, unknown):
+        self.unknown = unknown
+        super(ValidationError, self).__init__('unknown {}'.format(
+            ', '.join('{}: {}'.format(catalog, ', '.join(ids)) for catalog, ids in sorted(unknown.items()))))
 
 
 class ReportSuite(object):
@@ -10,14 +20,19 @@ class ReportSuite(object):
 
     """
 
-    def __init__(self, suite_id, name, client):
+    CATALOGS = ('metrics', 'dimensions', 'segments')
+    SEGMENTS_PAGE_SIZE = 1000
+
+    def __init__(self, suite_id, name, client, metadata_cache=None):
         self._suite_id = suite_id
         self._name = name
         self._client = client
+        self._metadata_cache = metadata_cache
 
         self._metrics = None
         self._dimensions = None
         self._segments = None
+        self._indexes = {}
 
     @property
     def name(self):
@@ -29,73 +44,163 @@ class ReportSuite(object):
 
     @property
     def metrics(self):
-        if not self._metrics:
+        if self._metrics is None:
             self._metrics = self._get_metrics()
 
         return self._metrics
 
     @property
     def dimensions(self):
-        if not self._dimensions:
+        if self._dimensions is None:
             self._dimensions = self._get_dimensions()
 
         return self._dimensions
 
     @property
     def segments(self):
-        if not self._segments:
+        if self._segments is None:
             self._segments = self._get_segments()
 
         return self._segments
 
-    def fill(self):
-        pool = ThreadPoolExecutor(max_workers=3)
-        futures = [pool.submit(self._get_metrics), pool.submit(
-            self._get_dimensions), pool.submit(self._get_segments)]
-        results = [result for result in as_completed(futures)]
+    def load(self, catalog):
+        """Loads a catalog (see ``CATALOGS``) unless it is already loaded."""
+        if catalog not in ReportSuite.CATALOGS:
+            raise ValueError('unknown catalog {}'.format(catalog))
 
-        import ipdb
-        ipdb.set_trace()
+        return getattr(self, catalog)
 
-        return results
+    def fill(self, catalogs=CATALOGS):
+        """Loads the given catalogs concurrently. Returns the suite.
+
+        To warm many suites at once use ``Account.prefetch``.
+        """
+        pool = ThreadPoolExecutor(max_workers=len(catalogs))
+        try:
+            futures = [pool.submit(self.load, catalog) for catalog in catalogs]
+            for future in futures:
+                future.result()
+        finally:
+            pool.shutdown(wait=True)
+
+        return self
 
     def validate(self, dimensions=None, segments=None, metrics=None):
-        pass
+        """Checks ids against the suite catalogs without calling the API.
+
+        Calculated metrics (``cm`` ids) aren't part of the metrics catalog and
+        are not checked.
+
+        Raises:
+            ValidationError: listing the unknown ids by catalog.
+        """
+        references = {'dimensions': dimensions or [],
+                      'segments': segments or [],
+                      'metrics': [m for m in metrics or [] if not m.startswith('cm')]}
+        unknown = {}
+
+        for catalog, ids in references.items():
+            if not ids:
+                continue
+
+            index = self._index(catalog)
+            missing = [i for i in ids if i not in index]
+            if missing:
+                unknown[catalog] = missing
+
+        if unknown:
+            raise ValidationError(unknown)
+
+    def validate_query(self, query):
+        self.validate_payload(query.compile())
+
+    def validate_payload(self, payload):
+        """Validates the dimension, metrics, segments and breakdown dimensions
+        referenced by a compiled query."""
+        if payload.get('rsid', self._suite_id) != self._suite_id:
+            raise QueryError('query targets report suite {}'.format(payload['rsid']))
+
+        dimensions = [payload['dimension']] if payload.get('dimension') else []
+        segments = [f['segmentId'] for f in payload.get('globalFilters', []) if f.get('type') == 'segment']
+
+        for metric_filter in payload.get('metricFilters', []):
+            if metric_filter.get('type') == 'breakdown':
+                dimensions.append(metric_filter['dimension'])
+            elif 'segmentId' in metric_filter:
+                segments.append(metric_filter['segmentId'])
+
+        metrics = [metric['id'] for metric in payload.get('metricContainer', {}).get('metrics', [])]
+
+        self.validate(dimensions=dimensions, segments=segments, metrics=metrics)
+
+    def validate_request(self, request):
+        """Validator for batch executors: checks report requests only."""
+        if request.resource.startswith('/reports'):
+            self.validate_payload(request.payload)
+
+    def _index(self, catalog):
+        index = self._indexes.get(catalog)
+        if index is None:
+            index = self._indexes[catalog] = frozenset(item.id for item in self.load(catalog))
+
+        return index
 
     def _get_metrics(self):
-        print "metrics got called"
+        return self._load('metrics', self._fetch_metrics)
+
+    def _get_dimensions(self):
+        return self._load('dimensions', self._fetch_dimensions)
+
+    def _get_segments(self):
+        return self._load('segments', self._fetch_segments)
+
+    def _load(self, catalog, fetch):
+        if self._metadata_cache is None:
+            content = fetch()
+        else:
+            content = self._metadata_cache.get(self._client.company_id, self._suite_id, catalog, fetch)
+
+        with self._client.timer('/{}'.format(catalog), 'convert'):
+            return [to_dynamic_object(item) for item in content]
+
+    def _fetch_metrics(self):
         request = Request(Request.Method.GET,
                           '/metrics?rsid={}'.format(self._suite_id))
         response = self._client.execute(request)
 
         assert isinstance(response, list)
-        metrics = [to_dynamic_object(metric) for metric in response]
 
-        return metrics
+        return response
 
-    def _get_dimensions(self):
-        print "dimensions got called"
+    def _fetch_dimensions(self):
         request = Request(Request.Method.GET,
                           '/dimensions?rsid={}'.format(self._suite_id))
         response = self._client.execute(request)
 
         assert isinstance(response, list)
-        dimensions = [to_dynamic_object(
-            dimension) for dimension in response]
 
-        return dimensions
+        return response
 
-    def _get_segments(self):
-        print "segments got called"
-        request = Request(Request.Method.GET,
-                          '/segments?rsid={}'.format(self._suite_id))
-        response = self._client.execute(request)
-        content = response['content']
+    def _fetch_segments(self):
+        """Fetches every page of segments, shared ones included, so that
+        validation doesn't reject segments missing from the first page."""
+        segments = []
+        page = 0
+
+        while True:
+            request = Request(Request.Method.GET,
+                              '/segments?rsid={}&includeType=all&limit={}&page={}'.format(
+                                  self._suite_id, ReportSuite.SEGMENTS_PAGE_SIZE, page))
+            response = self._client.execute(request)
+            content = response['content']
+
+            assert isinstance(content, list)
 
-        assert isinstance(content, list)
-        segments = [to_dynamic_object(segment) for segment in content]
+            segments.extend(content)
+            if response.get('lastPage', True) or not content:
+                return segments
 
-        return segments
+            page += 1
 
     def __str__(self):
         return """
@@ -105,3 +210,36 @@ class ReportSuite(object):
                 \033[1m{:<10s}\033[0m{:>20s}
                 """.format('Id:', self._suite_id, 'Name:', self._name, 'Metrics:', self._metrics,
                            'Dimensions:', self._dimensions)
+
+
+class AsyncReportSuite(object):
+    """Wraps a :obj:`ReportSuite` so that its catalogs load without blocking.
+
+    Each catalog accessor returns a future; once resolved, the catalog is
+    cached on the wrapped suite like its synchronous counterpart.
+    """
+
+    def __init__(self, suite, async_client):
+        self._suite = suite
+        self._async_client = async_client
+
+    @property
+    def suite(self):
+        return self._suite
+
+    @property
+    def name(self):
+        return self._suite.name
+
+    @property
+    def suite_id(self):
+        return self._suite.suite_id
+
+    def metrics(self):
+        return self._async_client.submit(lambda: self._suite.metrics)
+
+    def dimensions(self):
+        return self._async_client.submit(lambda: self._suite.dimensions)
+
+    def segments(self):
+        return self._async_client.submit(lambda: self._suite.segments)
@@ -0,0 +1,68 @@
+import unittest
+from contextlib import contextmanager
+from mock import MagicMock
+from account import Account
+from client import RequestError
+
+
+class FakeClient(object):
+    company_id = 'company'
+
+    def __init__(self, failing=None):
+        self.failing = failing
+        self.resources = []
+
+    def execute(self, request):
+        self.resources.append(request.resource)
+
+        if request.resource == '/collections/suites?expansion=name':
+            return {'content': [{'rsid': 'suite1', 'name': 'Suite 1'}, {'rsid': 'suite2', 'name': 'Suite 2'}]}
+
+        if request.resource == self.failing:
+            raise RequestError(500, None, 'boom', None)
+
+        if request.resource.startswith('/segments'):
+            return {'content': [{'id': 's1'}]}
+
+        return [{'id': request.resource}]
+
+    @contextmanager
+    def timer(self, resource, phase):
+        yield
+
+
+class TestAccountMethods(unittest.TestCase):
+    def test_list_reports_suites(self):
+        suites = Account(FakeClient()).list_reports_suites()
+
+        self.assertEqual(['suite1', 'suite2'], [suite.suite_id for suite in suites])
+
+    def test_prefetch_populates_catalogs(self):
+        client = FakeClient()
+        account = Account(client)
+        suites = account.list_reports_suites()
+        progress = MagicMock()
+
+        errors = account.prefetch(suites, max_concurrency=2, progress=progress)
+
+        self.assertEqual({}, errors)
+        self.assertEqual(6, progress.call_count)
+        self.assertEqual((6, 6), progress.call_args[0][:2])
+
+        del client.resources[:]
+        self.assertEqual('/metrics?rsid=suite2', suites[1].metrics[0].id)
+        self.assertEqual([], client.resources)
+
+    def test_prefetch_reports_errors(self):
+        account = Account(FakeClient(failing='/dimensions?rsid=suite1'))
+        suites = account.list_reports_suites()
+
+        errors = account.prefetch(suites, catalogs=('metrics', 'dimensions'))
+
+        self.assertEqual(['suite1'], list(errors))
+        self.assertIsInstance(errors['suite1']['dimensions'], RequestError)
+        self.assertIsNotNone(suites[0]._metrics)
+        self.assertIsNone(suites[0]._dimensions)
+
+    def test_prefetch_unknown_catalog(self):
+        self.assertRaises(ValueError, Account(FakeClient()).prefetch, [], catalogs=('calculatedmetrics',))
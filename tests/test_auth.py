@@ -0,0 +1,200 @@
+import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import unittest
+from mock import MagicMock, patch
+from auth import (AuthError, FileTokenCache, JWTTokenProvider, OAuthTokenProvider, StaticTokenProvider, Token,
+                  TokenProvider)
+from client import Client, Request, RequestError
+
+
+class FakeTokenProvider(TokenProvider):
+    def __init__(self, lifetime=3600, **kwargs):
+        self.now = 1000.0
+        super(FakeTokenProvider, self).__init__(clock=lambda: self.now, **kwargs)
+        self.lifetime = lifetime
+        self.fetches = 0
+        self.release = None
+
+    @property
+    def cache_key(self):
+        return 'fake'
+
+    def _fetch(self):
+        if self.release is not None:
+            self.release.wait()
+        self.fetches += 1
+        return Token('token{}'.format(self.fetches), self.now + self.lifetime)
+
+
+def _join_background_threads():
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(5)
+
+
+def _auth_response(body, status_code=200):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = body
+    return response
+
+
+class TestTokenProviderMethods(unittest.TestCase):
+    def test_static(self):
+        provider = StaticTokenProvider('token')
+
+        self.assertEqual('token', provider.token())
+        self.assertFalse(provider.invalidate('token'))
+
+    def test_token_is_reused(self):
+        provider = FakeTokenProvider()
+
+        self.assertEqual('token1', provider.token())
+        self.assertEqual('token1', provider.token())
+        self.assertEqual(1, provider.fetches)
+
+    def test_refreshes_in_background_before_expiry(self):
+        provider = FakeTokenProvider(refresh_margin=300)
+        provider.token()
+        provider.now += 3400
+
+        self.assertEqual('token1', provider.token())
+        _join_background_threads()
+        self.assertEqual('token2', provider.token())
+        self.assertEqual(2, provider.fetches)
+
+    def test_expired_token_is_fetched_once(self):
+        provider = FakeTokenProvider()
+        provider.token()
+        provider.now += 3600
+        provider.release = threading.Event()
+        tokens = []
+
+        threads = [threading.Thread(target=lambda: tokens.append(provider.token())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        provider.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(['token2'] * 8, tokens)
+        self.assertEqual(2, provider.fetches)
+
+    def test_invalidate(self):
+        provider = FakeTokenProvider()
+        provider.token()
+
+        provider.invalidate('other')
+        self.assertEqual('token1', provider.token())
+
+        self.assertTrue(provider.invalidate('token1'))
+        self.assertEqual('token2', provider.token())
+
+
+class TestOAuthTokenProviderMethods(unittest.TestCase):
+    @patch('auth.requests.post')
+    def test_fetch(self, post):
+        post.return_value = _auth_response({'access_token': 'token', 'token_type': 'bearer', 'expires_in': 86399})
+        provider = OAuthTokenProvider('id', 'secret', scopes=['openid', 'AdobeID'], clock=lambda: 1000.0)
+
+        self.assertEqual('token', provider.token())
+        self.assertEqual(87399.0, provider._token.expires_at)
+        self.assertEqual({'grant_type': 'client_credentials', 'client_id': 'id', 'client_secret': 'secret',
+                          'scope': 'openid,AdobeID'}, post.call_args[1]['data'])
+
+    @patch('auth.requests.post')
+    def test_fetch_error(self, post):
+        post.return_value = _auth_response({'error': 'invalid_client', 'error_description': 'bad secret'}, 401)
+
+        with self.assertRaises(AuthError) as context:
+            OAuthTokenProvider('id', 'secret').token()
+
+        self.assertEqual('invalid_client', context.exception.error)
+
+
+class TestJWTTokenProviderMethods(unittest.TestCase):
+    @patch('auth.jwt', None)
+    def test_requires_pyjwt(self):
+        self.assertRaises(ImportError, JWTTokenProvider, 'id', 'secret', 'org', 'account', 'key')
+
+    @patch('auth.requests.post')
+    @patch('auth.jwt')
+    def test_fetch(self, jwt, post):
+        jwt.encode.return_value = 'signed'
+        post.return_value = _auth_response({'access_token': 'token', 'expires_in': 86399000})
+        provider = JWTTokenProvider('id', 'secret', 'org', 'account', 'key', clock=lambda: 1000.0)
+
+        self.assertEqual('token', provider.token())
+        self.assertEqual(87399.0, provider._token.expires_at)
+        claims = jwt.encode.call_args[0][0]
+        self.assertEqual('https://ims-na1.adobelogin.com/c/id', claims['aud'])
+        self.assertTrue(claims['https://ims-na1.adobelogin.com/s/ent_analytics_bulk_ingest_sdk'])
+        self.assertEqual('signed', post.call_args[1]['data']['jwt_token'])
+
+
+class TestFileTokenCacheMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'tokens.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shared_between_providers(self):
+        first = FakeTokenProvider(cache=FileTokenCache(self.path))
+        second = FakeTokenProvider(cache=FileTokenCache(self.path))
+
+        self.assertEqual('token1', first.token())
+        self.assertEqual('token1', second.token())
+        self.assertEqual(0, second.fetches)
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+    def test_discard(self):
+        cache = FileTokenCache(self.path)
+        provider = FakeTokenProvider(cache=cache)
+        provider.token()
+
+        provider.invalidate('token1')
+
+        with open(self.path) as f:
+            self.assertEqual({}, json.load(f))
+
+    def test_corrupted_file_is_ignored(self):
+        with open(self.path, 'w') as f:
+            f.write('{')
+
+        self.assertEqual('token1', FakeTokenProvider(cache=FileTokenCache(self.path)).token())
+
+
+class TestClientAuthentication(unittest.TestCase):
+    def _response(self, status_code, body):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = {}
+        response.content = json.dumps(body)
+        return response
+
+    def test_reauthenticates_once_on_401(self):
+        provider = FakeTokenProvider()
+        client = Client('key', 'company', provider)
+        rejected = self._response(401, {'error_code': '401013', 'message': 'Oauth token is not valid'})
+
+        with patch.object(client.transport.session, 'request',
+                          side_effect=[rejected, self._response(200, {'content': []})]) as request:
+            self.assertEqual({'content': []}, client.execute(Request(Request.Method.GET, '/collections/suites')))
+
+        self.assertEqual(['Bearer token1', 'Bearer token2'],
+                         [call[1]['headers']['Authorization'] for call in request.call_args_list])
+
+    def test_static_token_is_not_retried(self):
+        client = Client('key', 'company', 'token')
+        rejected = self._response(401, {'error_code': '401013', 'message': 'Oauth token is not valid'})
+
+        with patch.object(client.transport.session, 'request', return_value=rejected) as request:
+            self.assertRaises(RequestError, client.execute, Request(Request.Method.GET, '/collections/suites'))
+
+        self.assertEqual(1, request.call_count)
@@ -0,0 +1,74 @@
+import unittest
+from dateparser import parse
+from batch import QueryBatch
+from client import BatchResult, RequestError
+from query import FilterType, Metric, MetricFilter, Query
+
+
+class FakeClient(object):
+    """Answers with data derived from the metric ids so columns can be traced."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.payloads = []
+
+    def execute_many(self, batch, max_concurrency=None, ordered=False):
+        for index, request in enumerate(batch):
+            self.payloads.append(request.payload)
+            if self.fail:
+                yield BatchResult(index, request, error=RequestError(500, None, 'boom', None))
+                continue
+
+            metrics = request.payload['metricContainer']['metrics']
+            values = [len(metric['id']) for metric in metrics]
+            yield BatchResult(index, request, response={
+                'columns': {'columnIds': [metric['columnId'] for metric in metrics]},
+                'rows': [{'itemId': '1', 'value': 'Chrome', 'data': values}],
+                'summaryData': {'totals': values}})
+
+
+class TestQueryBatchMethods(unittest.TestCase):
+    def _query(self, metrics, dimension_id='variables/browser', segments=None):
+        return Query("cogntestsuite").select(dimension_id, metrics) \
+            .for_range(parse("2017-01-01T00:00:00.000"), parse("2018-12-31T23:59:59.999")) \
+            .with_segments(segments or [])
+
+    def test_compatible_queries_are_merged(self):
+        queries = [self._query([Metric('metrics/visits'), Metric('metrics/pageviews')]),
+                   self._query([Metric('metrics/orders', column_id='orders')]),
+                   self._query([Metric('metrics/visits')], dimension_id='variables/page')]
+
+        plans = QueryBatch(queries).plan()
+
+        self.assertEqual([[0, 1], [2]], [[index for index, _ in plan.members] for plan in plans])
+        merged = plans[0].request.payload['metricContainer']['metrics']
+        self.assertEqual(['0', '1', '2'], [metric['columnId'] for metric in merged])
+
+    def test_results_are_split_back(self):
+        segment = MetricFilter(FilterType.segment, 's300000938_5a3b3e1f')
+        queries = [self._query([Metric('metrics/visits'), Metric('metrics/pageviews')]),
+                   self._query([Metric('metrics/orders', column_id='orders'), Metric('metrics/visits')]),
+                   self._query([Metric('metrics/revenue', filters=[segment])])]
+        client = FakeClient()
+
+        results = QueryBatch(queries).execute(client)
+
+        self.assertEqual(1, len(client.payloads))
+        self.assertEqual(4, len(client.payloads[0]['metricContainer']['metrics']))
+        self.assertEqual(1, len(client.payloads[0]['metricFilters']))
+        self.assertEqual([14, 17], results[0].response['rows'][0]['data'])
+        self.assertEqual([14, 14], results[1].response['rows'][0]['data'])
+        self.assertEqual(['orders', '1'], results[1].response['columns']['columnIds'])
+        self.assertEqual([15], results[2].response['summaryData']['totals'])
+
+    def test_max_metrics(self):
+        queries = [self._query([Metric('metrics/visits')]), self._query([Metric('metrics/orders')])]
+
+        self.assertEqual(2, len(QueryBatch(queries, max_metrics=1).plan()))
+
+    def test_errors_reach_every_query(self):
+        queries = [self._query([Metric('metrics/visits')]), self._query([Metric('metrics/orders')])]
+
+        results = QueryBatch(queries).execute(FakeClient(fail=True))
+
+        self.assertEqual([False, False], [result.ok for result in results])
@@ -0,0 +1,43 @@
+import unittest
+from datetime import datetime
+from account import Account
+from benchmarks.server import StubServer
+from client import Client, Request, RequestError
+from query import Metric, Query
+from report import Report
+from throttle import RetryPolicy
+
+
+class TestStubServerMethods(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(pages=3).start()
+        self.client = Client('key', 'company', 'token', endpoint=self.server.endpoint,
+                             retry_policy=RetryPolicy(max_retries=1))
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_serves_fixtures(self):
+        suites = Account(self.client).list_reports_suites()
+
+        self.assertEqual(self.server.fixture('suites')['totalElements'], len(suites))
+        self.assertEqual(len(self.server.fixture('metrics')), len(suites[0].metrics))
+
+    def test_serves_pages(self):
+        query = Query('suite0').select('variables/geocity', [Metric('metrics/pageviews')]) \
+            .for_range(datetime(2017, 1, 1), datetime(2017, 1, 31))
+
+        pages = list(Report('suite0', query, self.client).pages())
+
+        self.assertEqual([0, 1, 2], [page['number'] for page in pages])
+        self.assertEqual(3, self.server.requests)
+
+    def test_throttles(self):
+        self.server.throttle_every = 1
+
+        with self.assertRaises(RequestError) as context:
+            self.client.execute(Request(Request.Method.GET, '/collections/suites'))
+
+        self.assertEqual(429, context.exception.status_code)
+        self.assertEqual(2, self.server.throttled)
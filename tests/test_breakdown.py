@@ -0,0 +1,82 @@
+import unittest
+from dateparser import parse
+from breakdown import Breakdown
+from client import RequestError
+from query import DimensionFilter, Metric, Query
+
+
+class FakeClient(object):
+    """Answers every report with one row per item of its dimension."""
+
+    def __init__(self, items, failing=None):
+        self.items = items
+        self.failing = failing
+        self.requests = []
+
+    def execute(self, request):
+        payload = request.payload
+        self.requests.append(payload)
+        path = sorted((f['dimension'], f['itemIds'][0]) for f in payload['metricFilters'])
+
+        if path == self.failing:
+            raise RequestError(400, 'invalid_query', 'bad', '1')
+
+        return {'rows': [{'itemId': item, 'value': item, 'data': [1]} for item in self.items[payload['dimension']]]}
+
+
+class TestBreakdownMethods(unittest.TestCase):
+    def setUp(self):
+        self.query = Query("cogntestsuite").select("variables/browser", [Metric('metrics/pageviews')]) \
+            .for_range(parse("2017-01-01T00:00:00.000"), parse("2018-12-31T23:59:59.999"))
+        self.items = {'variables/browser': ['1', '2'],
+                      'variables/page': ['10', '20', '30'],
+                      'variables/geocity': ['100']}
+
+    def test_builds_nested_tree(self):
+        client = FakeClient(self.items)
+
+        root = Breakdown(client, self.query, ['variables/page', 'variables/geocity'], max_concurrency=4).execute()
+
+        self.assertEqual(['1', '2'], [child.row['itemId'] for child in root.children])
+        self.assertEqual(['10', '20', '30'], [child.row['itemId'] for child in root.children[0].children])
+        leaf = root.children[1].children[2].children[0]
+        self.assertTrue(leaf.is_leaf)
+        self.assertEqual((('variables/browser', '2'), ('variables/page', '30'), ('variables/geocity', '100')),
+                         leaf.path)
+        self.assertEqual(1 + 2 + 6, len(client.requests))
+
+    def test_breakdown_requests_use_filters(self):
+        client = FakeClient(self.items)
+
+        Breakdown(client, self.query, ['variables/page']).execute()
+
+        breakdown_request = [r for r in client.requests if r['dimension'] == 'variables/page'][0]
+        filter_id = breakdown_request['metricFilters'][0]['id']
+        self.assertEqual([filter_id], breakdown_request['metricContainer']['metrics'][0]['filters'])
+
+    def test_root_dimension_filter_is_not_inherited(self):
+        client = FakeClient(self.items)
+        self.query.filter(DimensionFilter(items_ids=['1']))
+
+        Breakdown(client, self.query, ['variables/page']).execute()
+
+        self.assertEqual({'includeSearchTotal': True, 'itemId': '1'}, client.requests[0]['search'])
+        self.assertTrue(all('search' not in payload for payload in client.requests[1:]))
+        self.assertEqual(1 + 2, len(client.requests))
+
+    def test_streams_subtrees_before_root(self):
+        client = FakeClient(self.items)
+
+        nodes = list(Breakdown(client, self.query, ['variables/page']).stream())
+
+        self.assertEqual(3, len(nodes))
+        self.assertEqual((), nodes[-1].path)
+
+    def test_errors_are_kept_on_nodes(self):
+        client = FakeClient(self.items, failing=[('variables/browser', '1')])
+
+        root = Breakdown(client, self.query, ['variables/page']).execute()
+
+        self.assertIsInstance(root.children[0].error, RequestError)
+        self.assertEqual([], root.children[0].children)
+        self.assertEqual(3, len(root.children[1].children))
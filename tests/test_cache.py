@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from cache import MemoryCache, SqliteCache, cache_key
+from client import Request
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000000000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _report_request(end_date):
+    payload = {'rsid': 'cogntestsuite',
+               'globalFilters': [{'type': 'dateRange',
+                                  'dateRange': '2017-01-01T00:00:00/{}'.format(end_date.isoformat())}]}
+    return Request(Request.Method.POST, '/reports', payload=payload)
+
+
+class TestCacheKey(unittest.TestCase):
+    def test_key_ignores_payload_order(self):
+        first = Request(Request.Method.POST, '/reports', payload={'rsid': 'a', 'dimension': 'variables/page'})
+        second = Request(Request.Method.POST, '/reports', payload={'dimension': 'variables/page', 'rsid': 'a'})
+
+        self.assertEqual(cache_key(first), cache_key(second))
+
+    def test_key_depends_on_method_and_resource(self):
+        keys = set([cache_key(Request(Request.Method.GET, '/metrics?rsid=a')),
+                    cache_key(Request(Request.Method.POST, '/metrics?rsid=a')),
+                    cache_key(Request(Request.Method.GET, '/metrics?rsid=b'))])
+
+        self.assertEqual(3, len(keys))
+
+    def test_key_depends_on_scope(self):
+        request = Request(Request.Method.GET, '/collections/suites')
+
+        self.assertNotEqual(cache_key(request, ['companyA']), cache_key(request, ['companyB']))
+
+
+class TestMemoryCacheMethods(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = MemoryCache(max_entries=2, clock=self.clock)
+
+    def test_lru_eviction(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+
+        self.assertEqual(1, self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(3, self.cache.get('c'))
+
+    def test_ttl(self):
+        self.cache.set('a', 1, ttl=10)
+        self.clock.now += 11
+
+        self.assertIsNone(self.cache.get('a'))
+
+    def test_settled_date_range_never_expires(self):
+        now = datetime.fromtimestamp(self.clock.now)
+
+        self.assertIsNone(self.cache.ttl_for(_report_request(now - timedelta(days=30))))
+        self.assertEqual(MemoryCache.DEFAULT_TTL, self.cache.ttl_for(_report_request(now)))
+
+
+class TestSqliteCacheMethods(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.clock = FakeClock()
+        self.cache = SqliteCache(os.path.join(self.directory, 'cache.db'), max_entries=2, clock=self.clock)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shared_between_instances(self):
+        self.cache.set('a', {'rows': [1, 2]})
+
+        other = SqliteCache(self.cache.path, clock=self.clock)
+
+        self.assertEqual({'rows': [1, 2]}, other.get('a'))
+
+    def test_eviction_and_ttl(self):
+        self.cache.set('a', 1, ttl=10)
+        self.clock.now += 1
+        self.cache.set('b', 2)
+        self.clock.now += 1
+        self.cache.set('c', 3)
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(2, self.cache.get('b'))
+
+        self.cache.set('d', 4, ttl=5)
+        self.clock.now += 6
+
+        self.assertIsNone(self.cache.get('d'))
@@ -0,0 +1,275 @@
+import json
+import threading
+import unittest
+from mock import MagicMock, patch
+from cache import MemoryCache
+from client import AsyncClient, Client, Request, RequestError
+from throttle import RetryPolicy
+
+
+def _response(body, status_code=200, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = json.dumps(body)
+    return response
+
+
+class TestClientMethods(unittest.TestCase):
+    def setUp(self):
+        self.client = Client('key', 'company', 'token', pool_size=4)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_pool_size(self):
+        adapter = self.client.transport.session.get_adapter('https://analytics.adobe.io/api/')
+
+        self.assertEqual(4, self.client.pool_size)
+        self.assertEqual(4, adapter._pool_maxsize)
+
+    def test_execute_reuses_session(self):
+        with patch.object(self.client.transport.session, 'request', return_value=_response({'content': []})) as request:
+            self.client.execute(Request(Request.Method.GET, '/collections/suites'))
+            self.client.execute(Request(Request.Method.GET, '/collections/suites'))
+
+        self.assertEqual(2, request.call_count)
+
+    def test_execute_error(self):
+        body = {'errorCode': 'invalid_query', 'errorDescription': 'bad', 'errorId': '1'}
+
+        with patch.object(self.client.transport.session, 'request', return_value=_response(body, 400)):
+            with self.assertRaises(RequestError) as context:
+                self.client.execute(Request(Request.Method.POST, '/reports'))
+
+        self.assertEqual(400, context.exception.status_code)
+        self.assertEqual('invalid_query', context.exception.error_code)
+
+    @patch('client.time.sleep')
+    def test_execute_retries_throttled_requests(self, sleep):
+        responses = [_response({'error_code': '429050', 'message': 'Too many requests'}, 429, {'Retry-After': '2'}),
+                     _response({'content': []})]
+
+        with patch.object(self.client.transport.session, 'request', side_effect=responses):
+            response = self.client.execute(Request(Request.Method.GET, '/collections/suites'))
+
+        self.assertEqual({'content': []}, response)
+        sleep.assert_called_once_with(2.0)
+
+    @patch('client.time.sleep')
+    def test_execute_reports_retries(self, sleep):
+        client = Client('key', 'company', 'token', retry_policy=RetryPolicy(max_retries=2))
+        throttled = _response({'error_code': '429050', 'message': 'Too many requests'}, 429)
+
+        with patch.object(client.transport.session, 'request', return_value=throttled):
+            with self.assertRaises(RequestError) as context:
+                client.execute(Request(Request.Method.GET, '/collections/suites'))
+
+        self.assertEqual(429, context.exception.status_code)
+        self.assertEqual('429050', context.exception.error_code)
+        self.assertEqual(2, context.exception.retries)
+        self.assertEqual(2, sleep.call_count)
+
+    def test_execute_does_not_retry_query_errors(self):
+        body = {'errorCode': 'invalid_query', 'errorDescription': 'bad', 'errorId': '1'}
+
+        with patch.object(self.client.transport.session, 'request', return_value=_response(body, 400)) as request:
+            self.assertRaises(RequestError, self.client.execute, Request(Request.Method.POST, '/reports'))
+
+        self.assertEqual(1, request.call_count)
+
+    def test_execute_many_ordered(self):
+        batch = [Request(Request.Method.GET, '/metrics?rsid={}'.format(i)) for i in range(10)]
+
+        with patch.object(self.client, 'execute', side_effect=lambda request: request.resource):
+            results = list(self.client.execute_many(batch, max_concurrency=3, ordered=True))
+
+        self.assertEqual([r.resource for r in batch], [result.response for result in results])
+        self.assertEqual(list(range(10)), [result.index for result in results])
+
+    def test_execute_many_returns_errors(self):
+        batch = [Request(Request.Method.GET, '/metrics?rsid={}'.format(i)) for i in range(4)]
+
+        def execute(request):
+            if request.resource.endswith('2'):
+                raise RequestError(400, 'invalid_rsid', 'bad', '1')
+            return request.resource
+
+        with patch.object(self.client, 'execute', side_effect=execute):
+            results = sorted(self.client.execute_many(batch), key=lambda result: result.index)
+
+        self.assertEqual([True, True, False, True], [result.ok for result in results])
+        self.assertRaises(RequestError, results[2].result)
+
+    def test_execute_negotiates_compression(self):
+        client = Client('key', 'company', 'token', compression=False)
+
+        with patch.object(self.client.transport.session, 'request', return_value=_response({})) as request:
+            self.client.execute(Request(Request.Method.GET, '/collections/suites'))
+        with patch.object(client.transport.session, 'request', return_value=_response({})) as identity:
+            client.execute(Request(Request.Method.GET, '/collections/suites'))
+
+        self.assertEqual(self.client.transport.accept_encoding, request.call_args[1]['headers']['Accept-Encoding'])
+        self.assertEqual('identity', identity.call_args[1]['headers']['Accept-Encoding'])
+
+    def test_execute_uses_codec(self):
+        codec = MagicMock()
+        codec.encode.return_value = '{"rsid":"a"}'
+        codec.decode.return_value = {'rows': []}
+        client = Client('key', 'company', 'token', codec=codec)
+
+        with patch.object(client.transport.session, 'request', return_value=_response(None)) as request:
+            response = client.execute(Request(Request.Method.POST, '/reports', payload={'rsid': 'a'}))
+
+        self.assertEqual({'rows': []}, response)
+        codec.encode.assert_called_once_with({'rsid': 'a'})
+        self.assertEqual('{"rsid":"a"}', request.call_args[1]['data'])
+        self.assertEqual('application/json', request.call_args[1]['headers']['Content-Type'])
+
+    def test_execute_uses_cache(self):
+        client = Client('key', 'company', 'token', cache=MemoryCache())
+
+        with patch.object(client.transport.session, 'request', return_value=_response([{'id': 'metrics/pageviews'}])) as request:
+            client.execute(Request(Request.Method.GET, '/metrics?rsid=a'))
+            response = client.execute(Request(Request.Method.GET, '/metrics?rsid=a'))
+
+        self.assertEqual([{'id': 'metrics/pageviews'}], response)
+        self.assertEqual(1, request.call_count)
+
+    def test_shared_cache_is_scoped_per_client(self):
+        cache = MemoryCache()
+        clients = [Client('key', 'companyA', 'token', cache=cache),
+                   Client('key', 'companyB', 'token', cache=cache),
+                   Client('other', 'companyA', 'other', cache=cache),
+                   Client('key', 'companyA', 'token', cache=cache)]
+        request = Request(Request.Method.GET, '/collections/suites')
+        responses = []
+
+        for index, client in enumerate(clients):
+            with patch.object(client.transport.session, 'request', return_value=_response({'content': [index]})):
+                responses.append(client.execute(request))
+
+        self.assertEqual([{'content': [0]}, {'content': [1]}, {'content': [2]}, {'content': [0]}], responses)
+
+    def test_execute_stream(self):
+        raw_response = _response(None)
+        raw_response.iter_content.return_value = [b'{"totalPages": 1, "rows": [{"itemId": "1"}, ',
+                                                  b'{"itemId": "2"}], "lastPage": true}']
+
+        with patch.object(self.client.transport.session, 'request', return_value=raw_response) as request:
+            response = self.client.execute_stream(Request(Request.Method.POST, '/reports'))
+            rows = list(response)
+
+        self.assertTrue(request.call_args[1]['stream'])
+        self.assertEqual(['1', '2'], [row['itemId'] for row in rows])
+        self.assertEqual({'totalPages': 1, 'lastPage': True}, response.metadata)
+        raw_response.close.assert_called_once_with()
+
+    def test_concurrent_identical_requests_are_coalesced(self):
+        release = threading.Event()
+        responses = []
+
+        def execute(request):
+            release.wait(5)
+            return {'content': []}
+
+        with patch.object(self.client, '_execute', side_effect=execute) as _execute:
+            threads = [threading.Thread(target=lambda: responses.append(
+                self.client.execute(Request(Request.Method.GET, '/collections/suites')))) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            while not _execute.called:
+                release.wait(0.01)
+            release.wait(0.05)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(1, _execute.call_count)
+        self.assertEqual([{'content': []}] * 5, responses)
+        self.assertEqual({}, self.client._in_flight)
+
+    def test_coalesced_errors_are_raised(self):
+        body = {'errorCode': 'invalid_query', 'errorDescription': 'bad', 'errorId': '1'}
+
+        with patch.object(self.client.transport.session, 'request', return_value=_response(body, 400)):
+            self.assertRaises(RequestError, self.client.execute, Request(Request.Method.POST, '/reports'))
+
+        self.assertEqual({}, self.client._in_flight)
+
+    def test_followers_return_when_the_leader_is_interrupted(self):
+        release = threading.Event()
+        errors = []
+
+        def execute(request):
+            release.wait(5)
+            raise KeyboardInterrupt()
+
+        def follow():
+            try:
+                self.client.execute(Request(Request.Method.GET, '/collections/suites'))
+            except KeyboardInterrupt as e:
+                errors.append(e)
+
+        with patch.object(self.client, '_execute', side_effect=execute) as _execute:
+            threads = [threading.Thread(target=follow) for _ in range(3)]
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+            while not _execute.called:
+                release.wait(0.01)
+            release.wait(0.05)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(1, _execute.call_count)
+        self.assertEqual(3, len(errors))
+        self.assertEqual({}, self.client._in_flight)
+
+    def test_context_manager_closes_session(self):
+        client = Client('key', 'company', 'token')
+
+        with patch.object(client.transport.session, 'close') as close:
+            with client:
+                pass
+
+        close.assert_called_once_with()
+
+
+class TestAsyncClientMethods(unittest.TestCase):
+    def setUp(self):
+        self.client = Client('key', 'company', 'token')
+        self.async_client = AsyncClient(self.client, max_concurrency=2)
+
+    def tearDown(self):
+        self.async_client.close()
+        self.client.close()
+
+    def test_execute_returns_future(self):
+        with patch.object(self.client.transport.session, 'request', return_value=_response({'content': []})):
+            future = self.async_client.execute(Request(Request.Method.GET, '/collections/suites'))
+
+            self.assertEqual({'content': []}, future.result())
+
+    def test_identical_pending_requests_share_future(self):
+        release = threading.Event()
+
+        with patch.object(self.client, 'execute', side_effect=lambda request: release.wait(5)) as execute:
+            first = self.async_client.execute(Request(Request.Method.GET, '/metrics?rsid=a'))
+            second = self.async_client.execute(Request(Request.Method.GET, '/metrics?rsid=a'))
+            other = self.async_client.execute(Request(Request.Method.GET, '/metrics?rsid=b'))
+            release.set()
+            other.result()
+
+        self.assertIs(first, second)
+        self.assertEqual(2, execute.call_count)
+
+    def test_execute_propagates_request_error(self):
+        body = {'errorCode': 'invalid_query', 'errorDescription': 'bad', 'errorId': '1'}
+
+        with patch.object(self.client.transport.session, 'request', return_value=_response(body, 400)):
+            future = self.async_client.execute(Request(Request.Method.POST, '/reports'))
+
+            self.assertRaises(RequestError, future.result)
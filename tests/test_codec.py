@@ -0,0 +1,44 @@
+import unittest
+from mock import MagicMock, patch
+from codec import available_codecs, get_codec
+
+
+class TestCodecMethods(unittest.TestCase):
+    def test_json_roundtrip(self):
+        codec = get_codec('json')
+
+        self.assertEqual('{"rsid":"suite1"}', codec.encode({'rsid': 'suite1'}))
+        self.assertEqual({'rsid': 'suite1'}, codec.decode('{"rsid": "suite1"}'))
+        self.assertRaises(ValueError, codec.decode, '<html>')
+
+    def test_json_is_always_available(self):
+        self.assertIn('json', [codec.name for codec in available_codecs()])
+
+    def test_floats_roundtrip(self):
+        value = {'data': [0.1234567890123456, 1e-17, 12345678901.234567]}
+
+        for codec in available_codecs():
+            self.assertEqual(value, codec.decode(codec.encode(value)), codec.name)
+
+    def test_ujson_is_not_the_default(self):
+        with patch('codec.orjson', None), patch('codec.ujson', MagicMock()):
+            self.assertNotEqual('ujson', get_codec().name)
+
+    def test_ujson_decodes_precise_floats(self):
+        ujson = MagicMock()
+
+        with patch('codec.ujson', ujson):
+            codec = get_codec('ujson')
+            codec.decode('[0.1234567890123456]')
+            encoded = codec.encode([0.1234567890123456])
+
+        ujson.loads.assert_called_once_with('[0.1234567890123456]', precise_float=True)
+        self.assertEqual('[0.1234567890123456]', encoded)
+
+        ujson.loads.side_effect = Exception('Expected object or value')
+        with patch('codec.ujson', ujson):
+            self.assertRaises(ValueError, get_codec('ujson').decode, '<html>')
+
+    def test_unavailable_codec(self):
+        with patch('codec.orjson', None):
+            self.assertRaises(ValueError, get_codec, 'orjson')
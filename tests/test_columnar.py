@@ -0,0 +1,76 @@
+import math
+import unittest
+from columnar import ColumnarResult, numpy, pandas
+
+
+def _pages():
+    return [{'rows': [{'itemId': '1', 'value': 'Chrome', 'data': [10, 0.5]},
+                      {'itemId': '2', 'value': 'Safari', 'data': [5, None]}]},
+            {'rows': [{'itemId': '3', 'value': 'Chrome', 'data': [1, 0.25]}]}]
+
+
+class TestColumnarResultMethods(unittest.TestCase):
+    def setUp(self):
+        self.result = ColumnarResult.from_pages(['metrics/pageviews', 'metrics/bouncerate'], _pages())
+
+    def test_columns(self):
+        self.assertEqual(3, len(self.result))
+        self.assertEqual([10, 5, 1], list(self.result.column('metrics/pageviews')))
+        self.assertTrue(math.isnan(self.result.column('metrics/bouncerate')[1]))
+
+    def test_interned_values(self):
+        self.assertEqual(['Chrome', 'Safari'], self.result.categories)
+        self.assertEqual([0, 1, 0], list(self.result.codes))
+        self.assertEqual(['Chrome', 'Safari', 'Chrome'], self.result.values)
+
+    def test_item_ids(self):
+        self.assertEqual(['1', '2', '3'], self.result.item_ids)
+
+    def test_non_numeric_item_ids(self):
+        pages = [{'rows': [{'itemId': '1', 'value': 'a', 'data': [1]},
+                           {'itemId': '007', 'value': 'b', 'data': [2]}]}]
+
+        result = ColumnarResult.from_pages(['metrics/pageviews'], pages)
+
+        self.assertEqual(['1', '007'], result.item_ids)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_to_numpy_shares_buffers(self):
+        views = self.result.to_numpy()
+
+        self.assertEqual([10, 5, 1], views['metrics/pageviews'].tolist())
+        views['metrics/pageviews'][0] = 42
+        self.assertEqual(42, self.result.column('metrics/pageviews')[0])
+
+    @unittest.skipIf(pandas is None, 'pandas is not installed')
+    def test_to_pandas(self):
+        frame = self.result.to_pandas()
+
+        self.assertEqual(['value', 'metrics/pageviews', 'metrics/bouncerate'], list(frame.columns))
+        self.assertEqual(['1', '2', '3'], list(frame.index))
+        self.assertEqual(object, frame.index.dtype)
+        self.assertEqual(10, frame.loc['1', 'metrics/pageviews'])
+        self.assertEqual(['Chrome', 'Safari', 'Chrome'], list(frame['value']))
+
+    @unittest.skipIf(pandas is None, 'pandas is not installed')
+    def test_to_pandas_numeric_index(self):
+        frame = self.result.to_pandas(numeric_index=True)
+
+        self.assertEqual([1, 2, 3], list(frame.index))
+        self.assertEqual(numpy.int64, frame.index.dtype)
+
+    @unittest.skipIf(pandas is None, 'pandas is not installed')
+    def test_to_pandas_numeric_index_needs_integer_ids(self):
+        result = ColumnarResult.from_pages(['metrics/pageviews'], [{'rows': [{'itemId': 'a', 'value': 'a', 'data': [1]}]}])
+
+        self.assertEqual(['a'], list(result.to_pandas().index))
+        self.assertRaises(ValueError, result.to_pandas, numeric_index=True)
+
+    @unittest.skipIf(pandas is None, 'pandas is not installed')
+    def test_to_pandas_shares_buffers(self):
+        frame = self.result.to_pandas()
+
+        self.assertTrue(numpy.may_share_memory(frame['metrics/pageviews'].values,
+                                               self.result.to_numpy()['metrics/pageviews']))
+        frame.loc['1', 'metrics/pageviews'] = 42
+        self.assertEqual(42, self.result.column('metrics/pageviews')[0])
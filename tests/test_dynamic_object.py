@@ -0,0 +1,68 @@
+import pickle
+import unittest
+from dynamic_object import DynamicObject, to_dynamic_object
+
+
+class TestDynamicObjectMethods(unittest.TestCase):
+    def setUp(self):
+        self.raw = {'id': 'variables/page',
+                    'title': 'Page',
+                    'reportable': ['oberon'],
+                    'extraTitleInfo': {'segmentable': True, 'supportsDataGovernance': False}}
+
+    def test_attributes_are_snake_cased(self):
+        obj = to_dynamic_object(self.raw)
+
+        self.assertEqual('variables/page', obj.id)
+        self.assertEqual(['oberon'], obj.reportable)
+        self.assertFalse(obj.extra_title_info.supports_data_governance)
+
+    def test_nested_objects_are_memoized(self):
+        obj = to_dynamic_object(self.raw)
+
+        self.assertIs(obj.extra_title_info, obj.extra_title_info)
+
+    def test_missing_attribute(self):
+        obj = to_dynamic_object(self.raw)
+
+        self.assertRaises(AttributeError, getattr, obj, 'extraTitleInfo')
+        self.assertFalse(hasattr(obj, 'description'))
+
+    def test_iteration(self):
+        obj = to_dynamic_object({'dataType': 'int', 'name': 'Visits'})
+
+        self.assertEqual({'data_type': 'int', 'name': 'Visits'}, dict(obj))
+
+    def test_set_attribute(self):
+        obj = to_dynamic_object({'name': 'Visits'})
+        obj.name = 'Unique Visits'
+        obj.polarity = 'positive'
+
+        self.assertEqual({'name': 'Unique Visits', 'polarity': 'positive'}, dict(obj))
+
+    def test_keyword_arguments(self):
+        obj = DynamicObject(name='Visits')
+
+        self.assertEqual('Visits', obj.name)
+        self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_pickle(self):
+        obj = to_dynamic_object(self.raw)
+        obj.extra_title_info.segmentable = False
+        obj.polarity = 'positive'
+
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            copy = pickle.loads(pickle.dumps(obj, protocol))
+
+            self.assertEqual('variables/page', copy.id)
+            self.assertFalse(copy.extra_title_info.segmentable)
+            self.assertEqual('positive', copy.polarity)
+            self.assertEqual(obj._to_dict(), copy._to_dict())
+
+    def test_str(self):
+        obj = to_dynamic_object({'extraTitleInfo': {'segmentable': True}})
+
+        self.assertIn('"segmentable": true', str(obj))
+
+    def test_to_dynamic_object_expects_dict(self):
+        self.assertRaises(ValueError, to_dynamic_object, [])
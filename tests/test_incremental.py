@@ -0,0 +1,62 @@
+import unittest
+from datetime import datetime
+from cache import MemoryCache
+from incremental import IncrementalReport
+from query import Metric, Query
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.date_ranges = []
+
+    def execute(self, request):
+        self.date_ranges.append(request.payload['globalFilters'][0]['dateRange'])
+        return {'totalPages': 1,
+                'lastPage': True,
+                'rows': [{'itemId': '1', 'value': 'Chrome', 'data': [10]}],
+                'summaryData': {'totals': [10]}}
+
+
+class TestIncrementalReportMethods(unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryCache()
+        self.client = FakeClient()
+        self.now = datetime(2018, 1, 10, 12)
+
+    def _report(self):
+        query = Query("cogntestsuite").select("variables/browser", [Metric('metrics/pageviews')]) \
+            .for_range(datetime(2018, 1, 1), datetime(2018, 1, 11))
+
+        return IncrementalReport(self.client, query, self.store, clock=lambda: self.now)
+
+    def test_first_refresh_fetches_every_shard(self):
+        report = self._report()
+
+        result = report.refresh()
+
+        self.assertEqual(10, len(report.fetched))
+        self.assertEqual(100, result.rows[0]['data'][0])
+        self.assertEqual(datetime(2018, 1, 8), report.high_water_mark)
+
+    def test_later_refresh_fetches_open_window_only(self):
+        self._report().refresh()
+        self.client.date_ranges = []
+
+        report = self._report()
+        result = report.refresh()
+
+        self.assertEqual([(datetime(2018, 1, 8), datetime(2018, 1, 9)),
+                          (datetime(2018, 1, 9), datetime(2018, 1, 10)),
+                          (datetime(2018, 1, 10), datetime(2018, 1, 11))], report.fetched)
+        self.assertEqual(3, len(self.client.date_ranges))
+        self.assertEqual(100, result.rows[0]['data'][0])
+
+    def test_high_water_mark_moves_forward(self):
+        self._report().refresh()
+        self.now = datetime(2018, 1, 12)
+
+        report = self._report()
+        report.refresh()
+
+        self.assertEqual(datetime(2018, 1, 10), report.high_water_mark)
+        self.assertEqual(3, len(report.fetched))
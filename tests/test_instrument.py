@@ -0,0 +1,124 @@
+import json
+import logging
+import unittest
+from mock import MagicMock, patch
+from client import Client, Request, RequestError
+from codec import get_codec
+from instrument import Call, Histogram, Instrument, LogExporter, MetricsRecorder, PrometheusExporter
+
+
+def _response(body, status_code=200):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {}
+    response.content = json.dumps(body)
+    return response
+
+
+def _call(status_code=200, duration=0.2, timings=None):
+    ticks = iter([0.0, duration])
+    call = Call(Request(Request.Method.GET, '/metrics?rsid=suite'), clock=lambda: next(ticks))
+    call.status_code = status_code
+    call.timings = timings or {}
+    call.finish()
+    return call
+
+
+class TestHistogramMethods(unittest.TestCase):
+    def test_cumulative_counts(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        self.assertEqual([(0.1, 2), (1.0, 3), (float('inf'), 4)], histogram.cumulative_counts())
+        self.assertEqual(4, histogram.count)
+        self.assertAlmostEqual(2.65, histogram.sum)
+
+
+class TestMetricsRecorderMethods(unittest.TestCase):
+    def test_after_request(self):
+        recorder = MetricsRecorder()
+
+        recorder.after_request(_call(timings={'ttfb': 0.1}))
+        recorder.after_request(_call(status_code=None))
+
+        self.assertEqual({('GET', '/metrics', '200'): 1, ('GET', '/metrics', 'error'): 1}, recorder.requests)
+        self.assertEqual(1, recorder.latencies[('GET', '/metrics', '200')].count)
+        self.assertEqual(1, recorder.phases[('/metrics', 'ttfb')].count)
+
+    def test_prometheus_text(self):
+        recorder = MetricsRecorder(buckets=(0.5,))
+        recorder.after_request(_call())
+
+        text = PrometheusExporter(recorder).render()
+
+        self.assertIn('adobe_analytics_requests_total{method="GET",resource="/metrics",status="200"} 1', text)
+        self.assertIn('adobe_analytics_request_duration_seconds_bucket'
+                      '{method="GET",resource="/metrics",status="200",le="0.5"} 1', text)
+        self.assertIn('adobe_analytics_request_duration_seconds_bucket'
+                      '{method="GET",resource="/metrics",status="200",le="+Inf"} 1', text)
+        self.assertIn('# TYPE adobe_analytics_request_duration_seconds histogram', text)
+
+
+class TestLogExporterMethods(unittest.TestCase):
+    def test_logs_calls(self):
+        log = MagicMock()
+
+        LogExporter(log).after_request(_call())
+
+        level, message = log.log.call_args[0]
+        self.assertEqual(logging.INFO, level)
+        self.assertIn('"resource": "/metrics"', message)
+        self.assertEqual(200, log.log.call_args[1]['extra']['call']['status_code'])
+
+
+class TestClientInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.recorder = MetricsRecorder()
+        self.client = Client('key', 'company', 'token', instruments=[self.recorder], codec=get_codec('json'))
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_records_requests(self):
+        with patch.object(self.client.transport.session, 'request', return_value=_response({'content': []})):
+            self.client.execute(Request(Request.Method.POST, '/reports?locale=en', payload={'rsid': 'a'}))
+
+        self.assertEqual({('POST', '/reports', '200'): 1}, self.recorder.requests)
+        self.assertEqual({'/reports': 15}, self.recorder.bytes_received)
+        self.assertEqual({'/reports': 15}, self.recorder.bytes_transferred)
+        self.assertEqual({'/reports': 12}, self.recorder.bytes_sent)
+        self.assertEqual(set(['encode', 'auth', 'ttfb', 'download', 'decode']),
+                         set(phase for _, phase in self.recorder.phases))
+
+    def test_records_errors(self):
+        body = {'errorCode': 'invalid_query', 'errorDescription': 'bad', 'errorId': '1'}
+        instrument = MagicMock(spec=Instrument)
+        client = Client('key', 'company', 'token', instruments=[instrument])
+
+        with patch.object(client.transport.session, 'request', return_value=_response(body, 400)):
+            self.assertRaises(RequestError, client.execute, Request(Request.Method.POST, '/reports'))
+
+        call = instrument.after_request.call_args[0][0]
+        self.assertEqual(400, call.status_code)
+        self.assertIsInstance(call.error, RequestError)
+
+    def test_failing_instrument_is_ignored(self):
+        instrument = MagicMock(spec=Instrument)
+        instrument.before_request.side_effect = ValueError()
+        client = Client('key', 'company', 'token', instruments=[instrument])
+
+        with patch.object(client.transport.session, 'request', return_value=_response({'content': []})):
+            self.assertEqual({'content': []}, client.execute(Request(Request.Method.GET, '/collections/suites')))
+
+    def test_timer(self):
+        with self.client.timer('/metrics?rsid=suite', 'convert'):
+            pass
+
+        self.assertEqual(1, self.recorder.phases[('/metrics', 'convert')].count)
+
+    def test_execute_many_records_queue_wait(self):
+        with patch.object(self.client.transport.session, 'request', return_value=_response({'content': []})):
+            list(self.client.execute_many([Request(Request.Method.GET, '/collections/suites')]))
+
+        self.assertEqual(1, self.recorder.phases[('/collections/suites', 'queue')].count)
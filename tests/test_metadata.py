@@ -0,0 +1,66 @@
+import threading
+import unittest
+from cache import MemoryCache
+from metadata import MetadataCache
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMetadataCacheMethods(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = MetadataCache(MemoryCache(), ttl=10, max_stale=100, clock=self.clock)
+        self.calls = []
+
+    def _loader(self, value):
+        def load():
+            self.calls.append(value)
+            return value
+        return load
+
+    def test_fresh_catalog_is_served_from_store(self):
+        self.cache.get('company', 'rsid', 'metrics', self._loader(['a']))
+        value = self.cache.get('company', 'rsid', 'metrics', self._loader(['b']))
+
+        self.assertEqual(['a'], value)
+        self.assertEqual([['a']], self.calls)
+
+    def test_empty_catalog_is_cached(self):
+        self.cache.get('company', 'rsid', 'segments', self._loader([]))
+        value = self.cache.get('company', 'rsid', 'segments', self._loader(['b']))
+
+        self.assertEqual([], value)
+        self.assertEqual(1, len(self.calls))
+
+    def test_stale_catalog_is_revalidated_in_background(self):
+        self.cache.get('company', 'rsid', 'metrics', self._loader(['a']))
+        self.clock.now += 20
+
+        value = self.cache.get('company', 'rsid', 'metrics', self._loader(['b']))
+        for thread in threading.enumerate():
+            if thread is not threading.current_thread():
+                thread.join(5)
+
+        self.assertEqual(['a'], value)
+        self.assertEqual(['b'], self.cache.get('company', 'rsid', 'metrics', self._loader(['c'])))
+
+    def test_expired_catalog_is_reloaded(self):
+        self.cache.get('company', 'rsid', 'metrics', self._loader(['a']))
+        self.clock.now += 200
+
+        value = self.cache.get('company', 'rsid', 'metrics', self._loader(['b']))
+
+        self.assertEqual(['b'], value)
+
+    def test_keys_are_isolated(self):
+        self.cache.get('company', 'rsid', 'metrics', self._loader(['a']))
+
+        value = self.cache.get('company', 'other', 'metrics', self._loader(['b']))
+
+        self.assertEqual(['b'], value)
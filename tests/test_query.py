@@ -237,3 +237,38 @@ class TestQueryMethods(unittest.TestCase):
         output = query.compile()
 
         self.assertEqual(expected_output, output['settings'])
+
+    def test_metric_filter_id_is_deterministic(self):
+        first = MetricFilter(FilterType.segment, '53adb46be4b0a2a175bf38c4')
+        second = MetricFilter(FilterType.segment, '53adb46be4b0a2a175bf38c4')
+        other = MetricFilter(FilterType.segment, '76ceb46be4b0a2a175bf38de')
+
+        self.assertEqual(first.id, second.id)
+        self.assertNotEqual(first.id, other.id)
+        self.assertEqual(16, len(first.id))
+
+    def test_fingerprint(self):
+        def build(segment_id):
+            metric = Metric('metrics/pageviews', 0,
+                            filters=[MetricFilter(FilterType.segment, segment_id)])
+
+            return Query("cogntestsuite").select("variables/geocity", [metric]) \
+                .for_range(parse("2017-01-01T00:00:00.000"), parse("2018-12-31T23:59:59.999"))
+
+        self.assertEqual(build('53adb46be4b0a2a175bf38c4').fingerprint(),
+                         build('53adb46be4b0a2a175bf38c4').fingerprint())
+        self.assertNotEqual(build('53adb46be4b0a2a175bf38c4').fingerprint(),
+                            build('76ceb46be4b0a2a175bf38de').fingerprint())
+
+    def test_next_before_compile(self):
+        expected_output = {'page': '1', 'dimensionSort': 'asc'}
+
+        metric = Metric('metrics/averagetimespentonsite', 0)
+
+        query = Query("cogntestsuite").select("variables/geocity",
+                                              [metric]) \
+            .for_range(parse("2017-01-01T00:00:00.000"), parse("2018-12-31T23:59:59.999"))
+
+        output = query.next().compile()
+
+        self.assertEqual(expected_output, output['settings'])
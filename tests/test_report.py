@@ -0,0 +1,120 @@
+import unittest
+from dateparser import parse
+from mock import MagicMock, patch
+from client import BatchResult, RequestError
+from query import Metric, Query
+from report import MultiSuiteReport, Report
+from suite import ReportSuite
+
+
+def _page(number, total_pages, rows):
+    return {'totalPages': total_pages,
+            'firstPage': number == 0,
+            'lastPage': number == total_pages - 1,
+            'number': number,
+            'rows': [{'itemId': str(row), 'value': str(row), 'data': [row]} for row in rows]}
+
+
+class FakeClient(object):
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def execute(self, request):
+        page = int(request.payload['settings']['page'])
+        self.requested.append(page)
+        return self.pages[page]
+
+    def execute_many(self, batch, max_concurrency=None, ordered=False):
+        self.max_concurrency = max_concurrency
+        for index, request in enumerate(batch):
+            yield BatchResult(index, request, response=self.execute(request))
+
+
+class TestReportMethods(unittest.TestCase):
+    def setUp(self):
+        self.query = Query("cogntestsuite").select("variables/geocity", [Metric('metrics/pageviews')]) \
+            .for_range(parse("2017-01-01T00:00:00.000"), parse("2018-12-31T23:59:59.999"))
+
+    def test_iterates_rows_of_every_page(self):
+        client = FakeClient([_page(0, 3, [1, 2]), _page(1, 3, [3, 4]), _page(2, 3, [5])])
+
+        rows = list(Report("cogntestsuite", self.query, client))
+
+        self.assertEqual([1, 2, 3, 4, 5], [row['data'][0] for row in rows])
+        self.assertEqual([0, 1, 2], client.requested)
+
+    def test_stops_at_last_page(self):
+        client = FakeClient([_page(0, 1, [1]), _page(1, 1, [])])
+
+        rows = list(Report("cogntestsuite", self.query, client))
+
+        self.assertEqual(1, len(rows))
+        self.assertEqual([0], client.requested)
+
+    def test_does_not_change_query_page(self):
+        client = FakeClient([_page(0, 2, [1]), _page(1, 2, [2])])
+
+        list(Report("cogntestsuite", self.query, client))
+
+        self.assertEqual('0', self.query.compile()['settings']['page'])
+
+    def test_pages_are_fetched_lazily(self):
+        client = MagicMock()
+        client.execute.return_value = _page(0, 10, [1])
+
+        pages = Report("cogntestsuite", self.query, client).pages()
+        next(pages)
+        pages.close()
+
+        self.assertLessEqual(client.execute.call_count, 2)
+
+    def test_fan_out_pages(self):
+        client = FakeClient([_page(number, 4, [number]) for number in range(4)])
+
+        rows = list(Report("cogntestsuite", self.query, client).rows(max_concurrency=3))
+
+        self.assertEqual([0, 1, 2, 3], [row['data'][0] for row in rows])
+        self.assertEqual([0, 1, 2, 3], client.requested)
+        self.assertEqual(3, client.max_concurrency)
+
+
+class TestMultiSuiteReportMethods(unittest.TestCase):
+    def setUp(self):
+        self.query = Query("cogntestsuite").select("variables/geocity", [Metric('metrics/pageviews')]) \
+            .for_range(parse("2017-01-01T00:00:00.000"), parse("2018-12-31T23:59:59.999"))
+
+    def test_runs_query_per_suite(self):
+        client = MagicMock()
+        client.execute.side_effect = lambda request: {
+            'lastPage': True, 'rows': [{'itemId': '1', 'value': request.payload['rsid'], 'data': [1]}]}
+
+        with patch.object(self.query, 'compile', wraps=self.query.compile) as compile:
+            results = MultiSuiteReport(client, self.query, ['suite1', 'suite2', 'suite3']).execute()
+
+        self.assertEqual(1, compile.call_count)
+        self.assertEqual(['suite1', 'suite2', 'suite3'], [result.suite_id for result in results])
+        self.assertEqual(['suite1', 'suite2', 'suite3'], [list(result.rows())[0]['value'] for result in results])
+
+    def test_union_tags_rows(self):
+        client = MagicMock()
+        client.execute.return_value = {'lastPage': True, 'rows': [{'itemId': '1', 'value': 'a', 'data': [1]}]}
+        suites = [ReportSuite('suite1', 'Suite 1', client), ReportSuite('suite2', 'Suite 2', client)]
+
+        rows = MultiSuiteReport(client, self.query, suites).union()
+
+        self.assertEqual(['suite1', 'suite2'], [row['rsid'] for row in rows])
+
+    def test_errors_are_kept_per_suite(self):
+        client = MagicMock()
+
+        def execute(request):
+            if request.payload['rsid'] == 'suite2':
+                raise RequestError(400, 'invalid_rsid', 'bad', '1')
+            return {'lastPage': True, 'rows': []}
+
+        client.execute.side_effect = execute
+
+        results = MultiSuiteReport(client, self.query, ['suite1', 'suite2']).execute()
+
+        self.assertEqual([True, False], [result.ok for result in results])
@@ -0,0 +1,82 @@
+import unittest
+from datetime import datetime
+from client import RequestError
+from query import Metric, Query
+from shard import Granularity, ShardedReport, is_additive, split_range
+
+
+class FakeClient(object):
+    """Answers every day with the same rows and fails on the given start dates."""
+
+    def __init__(self, failing=None):
+        self.failing = failing or []
+        self.date_ranges = []
+
+    def execute(self, request):
+        date_range = request.payload['globalFilters'][0]['dateRange']
+        self.date_ranges.append(date_range)
+
+        if date_range.split('/')[0] in self.failing:
+            raise RequestError(504, None, 'timeout', None)
+
+        return {'totalPages': 1,
+                'lastPage': True,
+                'rows': [{'itemId': '1', 'value': 'Chrome', 'data': [10, 2.5]},
+                         {'itemId': '2', 'value': 'Safari', 'data': [5, 1.5]}],
+                'summaryData': {'totals': [15, 2.0]}}
+
+
+class TestShardMethods(unittest.TestCase):
+    def test_split_by_day(self):
+        shards = split_range(datetime(2018, 1, 1, 12), datetime(2018, 1, 3, 6), Granularity.day)
+
+        self.assertEqual([(datetime(2018, 1, 1, 12), datetime(2018, 1, 2)),
+                          (datetime(2018, 1, 2), datetime(2018, 1, 3)),
+                          (datetime(2018, 1, 3), datetime(2018, 1, 3, 6))], shards)
+
+    def test_split_by_week(self):
+        shards = split_range(datetime(2018, 1, 3), datetime(2018, 1, 20), Granularity.week)
+
+        self.assertEqual([datetime(2018, 1, 3), datetime(2018, 1, 8), datetime(2018, 1, 15)],
+                         [start for start, _ in shards])
+
+    def test_split_by_month(self):
+        shards = split_range(datetime(2017, 11, 15), datetime(2018, 2, 1), Granularity.month)
+
+        self.assertEqual([(datetime(2017, 11, 15), datetime(2017, 12, 1)),
+                          (datetime(2017, 12, 1), datetime(2018, 1, 1)),
+                          (datetime(2018, 1, 1), datetime(2018, 2, 1))], shards)
+
+    def test_is_additive(self):
+        self.assertTrue(is_additive('metrics/pageviews'))
+        self.assertFalse(is_additive('metrics/visitors'))
+        self.assertFalse(is_additive('metrics/averagetimespentonsite'))
+        self.assertFalse(is_additive('cm300000938_5a3b3e1f'))
+
+
+class TestShardedReportMethods(unittest.TestCase):
+    def setUp(self):
+        metrics = [Metric('metrics/pageviews'), Metric('metrics/averagetimespentonsite')]
+        self.query = Query("cogntestsuite").select("variables/browser", metrics) \
+            .for_range(datetime(2018, 1, 1), datetime(2018, 1, 4))
+
+    def test_merges_shards(self):
+        client = FakeClient()
+
+        result = ShardedReport(client, self.query).execute()
+
+        self.assertEqual(3, len(client.date_ranges))
+        self.assertTrue(result.complete)
+        self.assertEqual(['metrics/averagetimespentonsite'], result.non_additive)
+        self.assertEqual([{'itemId': '1', 'value': 'Chrome', 'data': [30, None]},
+                          {'itemId': '2', 'value': 'Safari', 'data': [15, None]}], result.rows)
+        self.assertEqual([45, None], result.totals)
+
+    def test_keeps_failed_shards(self):
+        client = FakeClient(failing=['2018-01-02T00:00:00'])
+
+        result = ShardedReport(client, self.query, additive_metrics=['metrics/pageviews']).execute()
+
+        self.assertFalse(result.complete)
+        self.assertEqual([datetime(2018, 1, 2)], [shard.start_date for shard in result.errors])
+        self.assertEqual(20, result.rows[0]['data'][0])
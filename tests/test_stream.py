@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from stream import StreamingResponse
+
+
+def _chunks(body, size):
+    encoded = body.encode('utf-8')
+    return [encoded[i:i + size] for i in range(0, len(encoded), size)]
+
+
+class TestStreamingResponseMethods(unittest.TestCase):
+    def setUp(self):
+        self.body = {'totalPages': 12,
+                     'firstPage': True,
+                     'lastPage': False,
+                     'columns': {'dimension': {'id': 'variables/page', 'type': 'string'},
+                                 'columnIds': ['0', '1']},
+                     'rows': [{'itemId': str(i), 'value': u'p\xe1gina {}'.format(i), 'data': [i * 1.5, 12345]}
+                              for i in range(50)],
+                     'summaryData': {'totals': [1837.5, 617250]}}
+
+    def test_rows_and_metadata(self):
+        for size in (1, 7, 64, 100000):
+            response = StreamingResponse(_chunks(json.dumps(self.body, indent=1), size))
+
+            rows = list(response)
+
+            self.assertEqual(self.body['rows'], rows)
+            self.assertEqual(12, response.metadata['totalPages'])
+            self.assertEqual([1837.5, 617250], response.metadata['summaryData']['totals'])
+            self.assertNotIn('rows', response.metadata)
+
+    def test_rows_are_yielded_before_the_end(self):
+        chunks = iter(_chunks(json.dumps(self.body), 32))
+        response = StreamingResponse(chunks)
+
+        first = next(iter(response))
+
+        self.assertEqual('0', first['itemId'])
+        self.assertTrue(len(list(chunks)) > 0)
+
+    def test_numbers_split_across_chunks(self):
+        for body, split in (('{"rows":[1.5]}', '1.'), ('{"rows":[2e10]}', '2e'), ('{"rows":[-0.5e-10]}', '-0.5e-')):
+            position = body.index(split) + len(split)
+            response = StreamingResponse([body[:position].encode('utf-8'), body[position:].encode('utf-8')])
+
+            self.assertEqual(json.loads(body)['rows'], list(response))
+
+        for size in (1, 2, 3):
+            self.assertEqual([-0.5e10], list(StreamingResponse(_chunks('{"rows":[-0.5e10]}', size))))
+
+    def test_truncated_body(self):
+        response = StreamingResponse(_chunks(json.dumps(self.body)[:-40], 16))
+
+        self.assertRaises(ValueError, list, response)
+
+    def test_close_is_called(self):
+        closed = []
+        response = StreamingResponse(_chunks(json.dumps(self.body), 64), close=lambda: closed.append(True))
+
+        list(response)
+
+        self.assertEqual([True], closed)
+        self.assertTrue(response.consumed)
@@ -0,0 +1,115 @@
+import unittest
+from mock import MagicMock, patch
+from cache import MemoryCache
+from metadata import MetadataCache
+from client import Client, Request
+from dateparser import parse
+from query import FilterType, Metric, MetricFilter, Query
+from suite import ReportSuite, ValidationError
+
+
+class TestReportSuiteMethods(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.company_id = 'company'
+
+    def test_empty_catalog_is_loaded_once(self):
+        self.client.execute.return_value = {'content': []}
+        suite = ReportSuite('cogntestsuite', 'Test', self.client)
+
+        self.assertEqual([], suite.segments)
+        self.assertEqual([], suite.segments)
+        self.assertEqual(1, self.client.execute.call_count)
+
+    def test_catalog_items_are_dynamic_objects(self):
+        self.client.execute.return_value = [{'id': 'metrics/pageviews', 'dataType': 'int'}]
+        suite = ReportSuite('cogntestsuite', 'Test', self.client)
+
+        self.assertEqual('int', suite.metrics[0].data_type)
+
+    def test_metadata_cache_is_shared(self):
+        self.client.execute.return_value = [{'id': 'variables/page'}]
+        metadata_cache = MetadataCache(MemoryCache())
+
+        ReportSuite('cogntestsuite', 'Test', self.client, metadata_cache).dimensions
+        dimensions = ReportSuite('cogntestsuite', 'Test', self.client, metadata_cache).dimensions
+
+        self.assertEqual('variables/page', dimensions[0].id)
+        self.assertEqual(1, self.client.execute.call_count)
+
+    def test_fill_loads_catalogs(self):
+        self.client.execute.side_effect = lambda request: {'content': []} if 'segments' in request.resource else []
+        suite = ReportSuite('cogntestsuite', 'Test', self.client)
+
+        self.assertIs(suite, suite.fill())
+        self.assertEqual(3, self.client.execute.call_count)
+        self.assertEqual(([], [], []), (suite.metrics, suite.dimensions, suite.segments))
+        self.assertEqual(3, self.client.execute.call_count)
+
+
+class TestReportSuiteValidation(unittest.TestCase):
+    def setUp(self):
+        catalogs = {'/metrics?rsid=cogntestsuite': [{'id': 'metrics/pageviews'}, {'id': 'metrics/visits'}],
+                    '/dimensions?rsid=cogntestsuite': [{'id': 'variables/page'}, {'id': 'variables/browser'}],
+                    '/segments?rsid=cogntestsuite&includeType=all&limit=1000&page=0':
+                        {'content': [{'id': 's300000938_5a3b3e1f'}], 'lastPage': False},
+                    '/segments?rsid=cogntestsuite&includeType=all&limit=1000&page=1':
+                        {'content': [{'id': 's300000938_5b0d0001'}], 'lastPage': True}}
+        self.client = MagicMock()
+        self.client.execute.side_effect = lambda request: catalogs[request.resource]
+        self.suite = ReportSuite('cogntestsuite', 'Test', self.client)
+
+    def _query(self, dimension_id, metric_ids, segments=None):
+        metrics = [Metric(metric_id) for metric_id in metric_ids]
+
+        return Query('cogntestsuite').select(dimension_id, metrics) \
+            .for_range(parse("2017-01-01T00:00:00.000"), parse("2018-12-31T23:59:59.999")) \
+            .with_segments(segments or [])
+
+    def test_valid_query(self):
+        self.suite.validate_query(self._query('variables/page', ['metrics/pageviews', 'cm300000938_5a3b3e1f'],
+                                              ['s300000938_5a3b3e1f']))
+
+    def test_segments_on_later_pages(self):
+        self.suite.validate_query(self._query('variables/page', ['metrics/pageviews'], ['s300000938_5b0d0001']))
+
+        self.assertEqual(2, len(self.suite.segments))
+
+    def test_unknown_references(self):
+        query = self._query('variables/pages', ['metrics/pageview', 'metrics/visits'], ['s1'])
+
+        with self.assertRaises(ValidationError) as context:
+            self.suite.validate_query(query)
+
+        self.assertEqual({'dimensions': ['variables/pages'],
+                          'metrics': ['metrics/pageview'],
+                          'segments': ['s1']}, context.exception.unknown)
+
+    def test_breakdown_dimensions(self):
+        breakdown = MetricFilter(FilterType.breakdown, ('variables/geocity', ['1']))
+        query = Query('cogntestsuite').select('variables/page', [Metric('metrics/visits', filters=[breakdown])]) \
+            .for_range(parse("2017-01-01T00:00:00.000"), parse("2018-12-31T23:59:59.999"))
+
+        with self.assertRaises(ValidationError) as context:
+            self.suite.validate_query(query)
+
+        self.assertEqual({'dimensions': ['variables/geocity']}, context.exception.unknown)
+
+    def test_catalogs_are_indexed_once(self):
+        for _ in range(3):
+            self.suite.validate(metrics=['metrics/visits'])
+
+        self.assertEqual(1, self.client.execute.call_count)
+
+    def test_execute_many_rejects_invalid_requests(self):
+        client = Client('key', 'company', 'token')
+        batch = [Request(Request.Method.POST, '/reports', payload=self._query('variables/page', [m]).compile())
+                 for m in ('metrics/visits', 'metrics/unknown')]
+
+        with patch.object(client, 'execute', return_value={'rows': []}) as execute:
+            results = sorted(client.execute_many(batch, validator=self.suite.validate_request),
+                             key=lambda result: result.index)
+
+        self.assertTrue(results[0].ok)
+        self.assertIsInstance(results[1].error, ValidationError)
+        self.assertEqual(1, execute.call_count)
@@ -0,0 +1,63 @@
+import unittest
+from throttle import RateLimiter, RetryPolicy
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRateLimiterMethods(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(2, 1.0, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_burst_up_to_rate(self):
+        self.assertTrue(self.limiter.try_acquire())
+        self.assertTrue(self.limiter.try_acquire())
+        self.assertFalse(self.limiter.try_acquire())
+
+    def test_acquire_waits_for_refill(self):
+        self.limiter.acquire()
+        self.limiter.acquire()
+
+        waited = self.limiter.acquire()
+
+        self.assertAlmostEqual(0.5, waited)
+
+    def test_hold(self):
+        self.limiter.hold(3)
+
+        waited = self.limiter.acquire()
+
+        self.assertAlmostEqual(3.5, waited)
+
+    def test_for_company_is_shared(self):
+        self.assertIs(RateLimiter.for_company('company-a'), RateLimiter.for_company('company-a'))
+        self.assertIsNot(RateLimiter.for_company('company-a'), RateLimiter.for_company('company-b'))
+
+
+class TestRetryPolicyMethods(unittest.TestCase):
+    def test_should_retry(self):
+        policy = RetryPolicy(max_retries=1)
+
+        self.assertTrue(policy.should_retry(429, 0))
+        self.assertTrue(policy.should_retry(503, 0))
+        self.assertFalse(policy.should_retry(400, 0))
+        self.assertFalse(policy.should_retry(429, 1))
+
+    def test_exponential_delay(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5, jitter=lambda: 1.0)
+
+        self.assertEqual([1, 2, 4, 5], [policy.delay(retries) for retries in range(4)])
+
+    def test_retry_after_takes_precedence(self):
+        policy = RetryPolicy(jitter=lambda: 1.0)
+
+        self.assertEqual(7.0, policy.delay(0, '7'))
@@ -0,0 +1,77 @@
+import gzip
+import unittest
+from io import BytesIO
+from mock import MagicMock, patch
+from requests import Response
+from urllib3 import HTTPResponse
+from client import Client, Request, RequestError
+from transport import HTTP2Transport, InMemoryTransport, RequestsTransport
+
+
+class TestRequestsTransportMethods(unittest.TestCase):
+    def test_pool_size(self):
+        transport = RequestsTransport(pool_size=3)
+
+        self.assertEqual(3, transport.session.get_adapter('https://analytics.adobe.io/api/')._pool_maxsize)
+
+    def test_send(self):
+        transport = RequestsTransport()
+
+        with patch.object(transport.session, 'request') as request:
+            transport.send('POST', 'https://analytics.adobe.io/api/company/reports', {'a': 'b'}, '{"rsid":"x"}')
+
+        request.assert_called_once_with('POST', 'https://analytics.adobe.io/api/company/reports',
+                                        headers={'a': 'b'}, data='{"rsid":"x"}', stream=False)
+
+    def test_transferred_bytes(self):
+        compressed = BytesIO()
+        with gzip.GzipFile(fileobj=compressed, mode='wb') as f:
+            f.write('{"rows": []}' * 100)
+        response = Response()
+        response.raw = HTTPResponse(body=BytesIO(compressed.getvalue()), headers={'Content-Encoding': 'gzip'},
+                                    status=200, preload_content=False)
+
+        self.assertEqual(1200, len(response.content))
+        self.assertEqual(len(compressed.getvalue()), RequestsTransport().transferred_bytes(response))
+
+
+class TestHTTP2TransportMethods(unittest.TestCase):
+    @patch('transport.HTTP20Adapter', None)
+    def test_requires_hyper(self):
+        self.assertRaises(ImportError, HTTP2Transport)
+
+    @patch('transport.HTTP20Adapter')
+    def test_mounts_http2_adapter(self, adapter):
+        transport = HTTP2Transport()
+
+        self.assertIs(adapter.return_value, transport.session.get_adapter('https://analytics.adobe.io/api/'))
+        self.assertIsNot(adapter.return_value, transport.session.get_adapter('http://localhost/'))
+
+
+class TestInMemoryTransportMethods(unittest.TestCase):
+    def setUp(self):
+        self.handler = MagicMock(return_value=(200, {}, {'content': [{'rsid': 'suite1'}]}))
+        self.client = Client('key', 'company', 'token', transport=InMemoryTransport(self.handler))
+
+    def test_execute(self):
+        response = self.client.execute(Request(Request.Method.GET, '/collections/suites?expansion=name'))
+
+        self.assertEqual({'content': [{'rsid': 'suite1'}]}, response)
+        self.handler.assert_called_once_with('GET', '/api/company/collections/suites?expansion=name', {})
+
+    def test_execute_error(self):
+        self.handler.return_value = (400, {}, {'errorCode': 'invalid_query', 'errorDescription': 'bad', 'errorId': '1'})
+
+        with self.assertRaises(RequestError) as context:
+            self.client.execute(Request(Request.Method.POST, '/reports', payload={'rsid': 'suite1'}))
+
+        self.assertEqual('invalid_query', context.exception.error_code)
+        self.handler.assert_called_once_with('POST', '/api/company/reports', {'rsid': 'suite1'})
+
+    def test_execute_stream(self):
+        self.handler.return_value = (200, {}, {'rows': [{'itemId': '1'}, {'itemId': '2'}], 'totalPages': 1})
+
+        response = self.client.execute_stream(Request(Request.Method.POST, '/reports'), chunk_size=4)
+
+        self.assertEqual(['1', '2'], [row['itemId'] for row in response.rows()])
+        self.assertEqual(1, response.metadata['totalPages'])
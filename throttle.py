@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+from email.utils import mktime_tz, parsedate_tz
+
+
+class RateLimiter(object):
+    """Token bucket keeping requests under the API quota.
+
+    The bucket holds up to ``rate`` tokens and is refilled continuously at
+    ``rate`` tokens every ``per`` seconds, so bursts are allowed as long as the
+    window average stays under the quota. Instances are thread safe and are
+    meant to be shared by every client talking to the same company.
+    """
+
+    # Adobe Analytics allows 12 requests every 6 seconds per company.
+    DEFAULT_RATE = 12
+    DEFAULT_PERIOD = 6.0
+
+    _companies = {}
+    _companies_lock = threading.Lock()
+
+    def __init__(self, rate=DEFAULT_RATE, per=DEFAULT_PERIOD, clock=time.time, sleep=time.sleep):
+        if rate <= 0 or per <= 0:
+            raise ValueError('rate and per should be positive numbers')
+
+        self._rate = float(rate)
+        self._per = float(per)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self._rate
+        self._updated_at = clock()
+        self._blocked_until = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_company(cls, company_id, rate=DEFAULT_RATE, per=DEFAULT_PERIOD):
+        """Returns the limiter shared by every client of ``company_id``.
+
+        The first call for a company decides its rate; later calls return the
+        same instance.
+        """
+        with cls._companies_lock:
+            if company_id not in cls._companies:
+                cls._companies[company_id] = cls(rate, per)
+
+            return cls._companies[company_id]
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @property
+    def per(self):
+        return self._per
+
+    def acquire(self, tokens=1):
+        """Blocks until ``tokens`` can be spent. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            delay = self._reserve(tokens)
+            if not delay:
+                return waited
+
+            self._sleep(delay)
+            waited += delay
+
+    def try_acquire(self, tokens=1):
+        """Spends ``tokens`` if available right away."""
+        return not self._reserve(tokens)
+
+    def hold(self, seconds):
+        """Stops handing out tokens for ``seconds``, e.g. after a 429 response."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+            # The bucket starts refilling from empty once the hold is over.
+            self._updated_at = self._blocked_until
+            self._tokens = 0
+
+    def _reserve(self, tokens):
+        with self._lock:
+            now = self._clock()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            elapsed = max(0, now - self._updated_at)
+            self._tokens = min(self._rate, self._tokens + elapsed * self._rate / self._per)
+            self._updated_at = now
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+
+            return (tokens - self._tokens) * self._per / self._rate
+
+
+class RetryPolicy(object):
+    """Decides whether and when a failed request is sent again.
+
+    Throttled (429) and transient server responses are retried with jittered
+    exponential backoff; a ``Retry-After`` header sent by the server takes
+    precedence over the computed delay.
+    """
+
+    DEFAULT_RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=30.0, retry_statuses=DEFAULT_RETRY_STATUSES,
+                 jitter=random.random):
+        if max_retries < 0:
+            raise ValueError("max_retries can't have a negative value")
+
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._retry_statuses = frozenset(retry_statuses)
+        self._jitter = jitter
+
+    @property
+    def max_retries(self):
+        return self._max_retries
+
+    def should_retry(self, status_code, retries):
+        return retries < self._max_retries and status_code in self._retry_statuses
+
+    def can_retry(self, retries):
+        return retries < self._max_retries
+
+    def delay(self, retries, retry_after=None):
+        """Seconds to wait before attempt number ``retries + 1``."""
+        server_delay = self._parse_retry_after(retry_after)
+        if server_delay is not None:
+            return server_delay
+
+        # Full jitter: a random point of the exponentially growing window.
+        window = min(self._max_backoff, self._backoff * (2 ** retries))
+        return window * self._jitter()
+
+    @staticmethod
+    def _parse_retry_after(value):
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        parsed = parsedate_tz(value)
+        if not parsed:
+            return None
+
+        return max(0.0, mktime_tz(parsed) - time.time())
+
@@ -0,0 +1,135 @@
+import json
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.request import ACCEPT_ENCODING
+from urlparse import urlparse
+
+try:
+    from hyper.contrib import HTTP20Adapter
+except ImportError:
+    HTTP20Adapter = None
+
+
+class Transport(object):
+    """Sends the HTTP requests of a ``Client``.
+
+    ``send`` returns a :obj:`requests.Response`, or an object with the same
+    ``status_code``, ``headers``, ``content``, ``text``, ``json``,
+    ``iter_content`` and ``close`` members, with the body already
+    decompressed. Failures worth retrying raise ``requests.ConnectionError``
+    or ``requests.Timeout``. Transports are shared by every thread using the
+    client.
+    """
+
+    # Content codings the transport can decompress.
+    accept_encoding = 'identity'
+
+    def send(self, method, url, headers=None, body=None, stream=False):
+        """Sends a request.
+
+        Args:
+            method (str): ``GET`` or ``POST``.
+            body (str, optional): encoded JSON payload.
+            stream (bool): return as soon as the headers arrived and let the
+                caller read the body.
+        """
+        raise NotImplementedError()
+
+    def transferred_bytes(self, response):
+        """Size of a consumed response body as it was received, before decompression."""
+        return len(response.content)
+
+    def close(self):
+        """Releases the connections of the transport."""
+
+
+class RequestsTransport(Transport):
+    """HTTP/1.1 through a ``requests`` session with a pool of keep-alive connections.
+
+    Every request in flight needs its own connection, so ``pool_size`` caps the
+    concurrency; threads wait for a free connection instead of opening extra
+    sockets.
+    """
+
+    DEFAULT_POOL_SIZE = 10
+
+    # brotli is only offered when its package is installed.
+    accept_encoding = ACCEPT_ENCODING
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE):
+        self._pool_size = pool_size
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    @property
+    def session(self):
+        return self._session
+
+    @property
+    def pool_size(self):
+        return self._pool_size
+
+    def send(self, method, url, headers=None, body=None, stream=False):
+        return self._session.request(method, url, headers=headers, data=body, stream=stream)
+
+    def transferred_bytes(self, response):
+        # urllib3 counts the bytes read from the socket.
+        tell = getattr(response.raw, 'tell', None)
+        transferred = tell() if tell is not None else None
+
+        return transferred if isinstance(transferred, (int, long)) else len(response.content)
+
+    def close(self):
+        self._session.close()
+
+
+class HTTP2Transport(RequestsTransport):
+    """HTTP/2 for ``https`` endpoints, multiplexing concurrent requests over one connection per host.
+
+    Avoids a TLS handshake and a socket per request in flight when fanning out
+    pages, breakdowns or report suites. Requires the ``hyper`` package; plain
+    ``http`` endpoints keep using HTTP/1.1.
+    """
+
+    accept_encoding = 'gzip,deflate'
+
+    def __init__(self, pool_size=RequestsTransport.DEFAULT_POOL_SIZE):
+        if HTTP20Adapter is None:
+            raise ImportError('hyper is required to use HTTP/2')
+
+        super(HTTP2Transport, self).__init__(pool_size)
+        self._session.mount('https://', HTTP20Adapter())
+
+
+class InMemoryTransport(Transport):
+    """Answers requests with a function instead of the network, for tests and benchmarks.
+
+    Args:
+        handler (callable): called with the method, the path and query string
+            of the URL, and the payload of every request. Returns the status
+            code, the headers and the body, which is JSON encoded unless it is
+            already a string, e.g. ``benchmarks.server.StubServer.respond``.
+    """
+
+    def __init__(self, handler):
+        self._handler = handler
+
+    def send(self, method, url, headers=None, body=None, stream=False):
+        parsed = urlparse(url)
+        path = '{}?{}'.format(parsed.path, parsed.query) if parsed.query else parsed.path
+        status_code, response_headers, content = self._handler(method, path, json.loads(body) if body else {})
+
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(response_headers or {})
+        response.url = url
+        response.encoding = 'utf-8'
+        response.request = requests.Request(method, url, headers=headers, data=body).prepare()
+        response._content = content if isinstance(content, str) else json.dumps(content)
+        # Lets iter_content slice the body as there is no socket to read.
+        response._content_consumed = True
+
+        return response